@@ -0,0 +1,167 @@
+"""Headless benchmark for the playback engines.
+
+Runs each engine's playMidiOnce() against a recording fake sink over a
+generated corpus (see midiCorpus.py) and reports, per engine and file:
+
+- events/sec   device events (uinput) or port messages (MIDI out) per wall second
+- jitter       scheduling lateness p50 / p99 / max, from latencyStats
+- dispatch p99 time spent in simulateKey / the port send
+- cpu          CPU time of the playing thread as a share of wall time
+
+No /dev/uinput, MIDI port or display is needed; the engines still read
+the user's config.json, so keep it the same between runs you compare.
+
+Usage:
+  python -m benchmarks.benchPlayback
+  python -m benchmarks.benchPlayback --engines uinput midiOut --seconds 20
+  python -m benchmarks.benchPlayback --json after.json --baseline before.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fakeSinks
+
+fakeSinks.installFakeEvdev()
+
+from benchmarks import midiCorpus
+from modules.midiHandler import latencyStats
+from modules.midiHandler import timeline
+
+ENGINES = ("uinput", "drums", "midiOut")
+COMPILED = ("uinput", "midiOut")  # engines that play a precompiled timeline
+
+
+def _silence(*args, **kwargs):
+    pass
+
+
+def loadEngine(name):
+    """Import an engine and point it at a fake sink. Returns (engine, sink, cleanup)."""
+    if name == "uinput":
+        from modules.midiHandler import midiLinux as engine
+        engine.log = _silence
+        return engine, engine.openDevice(), engine.release_all
+
+    if name == "drums":
+        from modules.midiHandler import midiLinux
+        from modules.midiHandler import drumsLinux as engine
+        engine.log = _silence
+
+        def cleanup():
+            for k in list(engine.heldKeys):
+                engine.release(k)
+        return engine, midiLinux.openDevice(), cleanup
+
+    if name == "midiOut":
+        from modules.midiHandler import useOutput as engine
+        engine.log = _silence
+        engine.midiOut = fakeSinks.RecordingPort()
+
+        def cleanup():
+            engine.activeNotes.clear()
+            engine.activeTransposedNotes.clear()
+        return engine, engine.midiOut, cleanup
+
+    raise ValueError(f"unknown engine: {name}")
+
+
+def runCase(engine, sink, cleanup, midiPath: str, speed: float, compiled: bool = False) -> dict:
+    # compile outside the timed region, as startPlayback does
+    song = timeline.compileTimeline(midiPath) if compiled else midiPath
+
+    engine.stopEvent.clear()
+    engine.closeThread = False
+    engine.paused = False
+    engine.playbackSpeed = speed
+
+    latencyStats.enabled = True
+    latencyStats.lateness.reset()
+    latencyStats.dispatch.reset()
+    sink.reset()
+
+    wallStart = time.perf_counter()
+    cpuStart = time.thread_time()
+    engine.playMidiOnce(song)
+    cpu = time.thread_time() - cpuStart
+    wall = time.perf_counter() - wallStart
+
+    cleanup()
+    latencyStats.enabled = False
+
+    events = len(getattr(sink, "events", None) or getattr(sink, "messages", None) or [])
+    late = latencyStats.lateness.summary()
+    return {
+        "events": events,
+        "wall_s": round(wall, 3),
+        "events_per_s": round(events / wall, 1) if wall else 0.0,
+        "late_p50_us": late["p50_us"],
+        "late_p99_us": late["p99_us"],
+        "late_max_us": late["max_us"],
+        "dispatch_p99_us": latencyStats.dispatch.summary()["p99_us"],
+        "cpu_pct": round(100.0 * cpu / wall, 1) if wall else 0.0,
+    }
+
+
+def _printTable(results: dict, baseline: dict):
+    header = f"{'engine':<8} {'file':<7} {'events':>7} {'ev/s':>9} {'late p50':>9} {'p99':>8} {'max':>8} {'disp p99':>9} {'cpu%':>6}"
+    print(header)
+    print("-" * len(header))
+    for key, r in results.items():
+        engineName, fileName = key.split("/")
+        line = (
+            f"{engineName:<8} {fileName:<7} {r['events']:>7} {r['events_per_s']:>9.1f} "
+            f"{r['late_p50_us']:>9} {r['late_p99_us']:>8} {r['late_max_us']:>8} "
+            f"{r['dispatch_p99_us']:>9} {r['cpu_pct']:>6.1f}"
+        )
+        before = baseline.get(key)
+        if before and before.get("late_p99_us"):
+            change = 100.0 * (r["late_p99_us"] - before["late_p99_us"]) / before["late_p99_us"]
+            line += f"   p99 {change:+.0f}% vs baseline"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="nanoMIDIPlayer playback benchmark")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--files", nargs="+", choices=tuple(midiCorpus.CORPUS), default=list(midiCorpus.CORPUS))
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each generated file")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    parser.add_argument("--corpus", help="directory for generated files (default: temp dir)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    corpusDir = args.corpus or tempfile.mkdtemp(prefix="nanomidi-bench-")
+    paths = midiCorpus.generateCorpus(corpusDir, seconds=args.seconds)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for engineName in args.engines:
+        engine, sink, cleanup = loadEngine(engineName)
+        for fileName in args.files:
+            results[f"{engineName}/{fileName}"] = runCase(
+                engine, sink, cleanup, paths[fileName], args.speed, compiled=engineName in COMPILED
+            )
+
+    _printTable(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seconds": args.seconds, "speed": args.speed, "results": results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
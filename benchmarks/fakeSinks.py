@@ -0,0 +1,87 @@
+"""Recording stand-ins for the real output devices.
+
+FakeUInput mimics the small part of evdev.UInput the Linux engines use
+(write / syn / close) and RecordingPort mimics a mido output port. Both
+only append (timestamp, event) tuples, so a benchmark measures the
+engine itself and never types into whatever window has focus.
+"""
+
+import sys
+import time
+import types
+
+
+class FakeUInput:
+    def __init__(self, events=None, name="nanoMIDIPlayer-bench", bustype=None, **kwargs):
+        self.name = name
+        self.events = []
+        self.syncs = 0
+        self.closed = False
+
+    def write(self, etype, code, value):
+        self.events.append((time.perf_counter(), code, value))
+
+    def syn(self):
+        self.syncs += 1
+
+    def close(self):
+        self.closed = True
+
+    def reset(self):
+        self.events.clear()
+        self.syncs = 0
+
+
+class RecordingPort:
+    def __init__(self, name="nanoMIDIPlayer-bench"):
+        self.name = name
+        self.messages = []
+        self.closed = False
+
+    def send(self, message):
+        self.messages.append((time.perf_counter(), message.type))
+
+    def close(self):
+        self.closed = True
+
+    def reset(self):
+        self.messages.clear()
+
+
+def _ecodes():
+    try:
+        from evdev import ecodes
+        return ecodes
+    except ImportError:
+        pass
+
+    # Same numbers as linux/input-event-codes.h for the keys nanoMIDIPlayer maps.
+    codes = {"EV_SYN": 0, "EV_KEY": 1, "BUS_USB": 3}
+    letters = "QWERTYUIOP" + "ASDFGHJKL" + "ZXCVBNM"
+    rows = (16, 30, 44)
+    offset = 0
+    for row, length in zip(rows, (10, 9, 7)):
+        for i in range(length):
+            codes[f"KEY_{letters[offset + i]}"] = row + i
+        offset += length
+    for n in range(1, 10):
+        codes[f"KEY_{n}"] = n + 1
+    codes["KEY_0"] = 11
+    codes.update(KEY_SPACE=57, KEY_LEFTSHIFT=42, KEY_LEFTCTRL=29, KEY_LEFTALT=56)
+    return types.SimpleNamespace(**codes)
+
+
+def installFakeEvdev():
+    """
+    Make `from evdev import UInput, ecodes` resolve to FakeUInput.
+
+    Must run before modules.midiHandler.midiLinux is imported, so that
+    its lazily opened device is a FakeUInput. Real key codes are kept
+    when evdev is installed so the recorded events match what the device
+    would have received.
+    """
+    module = types.ModuleType("evdev")
+    module.UInput = FakeUInput
+    module.ecodes = _ecodes()
+    sys.modules["evdev"] = module
+    return module
@@ -0,0 +1,99 @@
+"""Generated MIDI files the playback benchmarks run against.
+
+Three shapes cover the engine's hot paths:
+- sparse: one note at a time, mostly idle waiting
+- chords: dense 4-8 note chords mixing plain, shifted and ctrl keys
+- black:  "black MIDI" style walls of notes across many tracks
+"""
+
+import os
+import random
+
+import mido
+
+TICKS_PER_BEAT = 480
+TEMPO = 500000  # 120 bpm → 480 ticks per 0.5 s
+
+
+def _ticks(seconds: float) -> int:
+    return int(round(seconds * TICKS_PER_BEAT * 1_000_000 / TEMPO))
+
+
+def _writeTrack(track, events):
+    """events: list of (absoluteSeconds, message) → delta-timed track."""
+    events.sort(key=lambda e: (e[0], e[1].type == "note_on"))
+    last = 0
+    for at, msg in events:
+        tick = _ticks(at)
+        track.append(msg.copy(time=tick - last))
+        last = tick
+
+
+def _newFile(trackCount: int):
+    mid = mido.MidiFile(ticks_per_beat=TICKS_PER_BEAT)
+    for i in range(trackCount):
+        track = mido.MidiTrack()
+        if i == 0:
+            track.append(mido.MetaMessage("set_tempo", tempo=TEMPO, time=0))
+        mid.tracks.append(track)
+    return mid
+
+
+def _note(events, at, length, note, velocity=80, channel=0):
+    events.append((at, mido.Message("note_on", note=note, velocity=velocity, channel=channel)))
+    events.append((at + length, mido.Message("note_off", note=note, velocity=0, channel=channel)))
+
+
+def sparse(seconds: float, rng: random.Random):
+    mid = _newFile(1)
+    events = []
+    at = 0.0
+    while at < seconds:
+        _note(events, at, 0.2, rng.randint(36, 96), rng.randint(40, 120))
+        at += 0.25
+    _writeTrack(mid.tracks[0], events)
+    return mid
+
+
+def chords(seconds: float, rng: random.Random):
+    mid = _newFile(1)
+    events = []
+    at = 0.0
+    while at < seconds:
+        # 21-108 so 88-key ctrl notes and shifted black keys both show up
+        for note in rng.sample(range(21, 109), rng.randint(4, 8)):
+            _note(events, at, 0.1, note, rng.randint(40, 120))
+        events.append((at, mido.Message("control_change", control=64, value=127 if rng.random() < 0.5 else 0)))
+        at += 0.125
+    _writeTrack(mid.tracks[0], events)
+    return mid
+
+
+def black(seconds: float, rng: random.Random, tracks: int = 16):
+    mid = _newFile(tracks)
+    for track in mid.tracks:
+        events = []
+        at = rng.uniform(0, 0.01)
+        while at < seconds:
+            _note(events, at, 0.03, rng.randint(21, 108), rng.randint(1, 127))
+            at += rng.choice((0.01, 0.02, 0.03))
+        _writeTrack(track, events)
+    return mid
+
+
+CORPUS = {
+    "sparse": sparse,
+    "chords": chords,
+    "black": black,
+}
+
+
+def generateCorpus(directory: str, seconds: float = 10.0, seed: int = 1):
+    """Write every corpus file into directory. Returns {name: path}."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, build in CORPUS.items():
+        path = os.path.join(directory, f"{name}.mid")
+        build(seconds, random.Random(f"{seed}:{name}")).save(path)
+        paths[name] = path
+    return paths
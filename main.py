@@ -9,6 +9,7 @@ import threading
 import argparse
 import time
 import errno
+import multiprocessing
 
 from PIL import Image
 from ui.midiPlayer import MidiPlayerTab
@@ -350,6 +351,8 @@ class App(ctk.CTk):
         self.focus_set()
 
 if __name__ == "__main__":
+    # the playback worker is spawned from this executable in frozen builds
+    multiprocessing.freeze_support()
     logFile = initLogging()
     logger.info(f"Application starting, logs at {logFile}")
     loading = LoadingScreen()
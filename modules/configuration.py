@@ -12,6 +12,12 @@ os.makedirs(baseDirectory, exist_ok=True)
 configFile = "config.json"
 configPath = os.path.join(baseDirectory, configFile)
 
+# Helper processes (the playback worker) set these before importing:
+# offline skips the remote default-config fetches, readOnly never
+# writes config.json so only the UI process owns it.
+offline = os.environ.get("NANOMIDI_OFFLINE") == "1"
+readOnly = os.environ.get("NANOMIDI_CONFIG_READONLY") == "1"
+
 def resourcePath(relativePath):
     if hasattr(sys, '_MEIPASS'):
         basePath = sys._MEIPASS
@@ -134,6 +140,8 @@ class ConfigManager:
                 localDefault = json.load(f)
         
         remoteDefault = {}
+        if offline:
+            return localDefault
         try:
             response = requests.get(self.remoteConfigUrl, timeout=5)
             if response.status_code == 200:
@@ -162,6 +170,8 @@ class ConfigManager:
             self.saveConfig()
     
     def checkRemoteUpdates(self):
+        if offline:
+            return
         try:
             response = requests.get(self.remoteConfigUrl, timeout=5)
             if response.status_code == 200:
@@ -188,6 +198,8 @@ class ConfigManager:
             self.saveConfig()
     
     def saveConfig(self):
+        if readOnly:
+            return
         with open(self.configPath, "w") as file:
             json.dump(self._configData.to_dict(), file, indent=2)
     
@@ -206,4 +218,11 @@ class ConfigManager:
     def save(self):
         self.saveConfig()
 
+    def to_dict(self):
+        return self._configData.to_dict()
+
+    def loadData(self, data):
+        """Replace the whole config in memory (used by the playback worker)."""
+        self._configData = SafeDict(self, data)
+
 configData = ConfigManager()
\ No newline at end of file
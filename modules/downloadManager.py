@@ -0,0 +1,130 @@
+import os
+import logging
+import threading
+import concurrent.futures
+
+from modules import httpClient
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# DOWNLOAD MANAGER
+# ============================================================
+# Hub downloads run on a small pool of threads so the Tk loop never
+# waits on the network:
+#   - the body is streamed to "<destination>.part" in CHUNK_SIZE pieces
+#   - an existing .part file is resumed with a Range request
+#   - the finished file is moved into place with os.replace, so a
+#     half-written MIDI never shows up in the downloads folder
+# Asking for a destination that is already queued returns the same
+# future instead of downloading it twice.
+
+CHUNK_SIZE = 64 * 1024
+MAX_PARALLEL = 3
+PART_SUFFIX = ".part"
+
+
+class DownloadManager:
+    """
+    download(url, destination, onProgress, onDone) queues a file and
+    returns a Future resolving to destination.
+
+    onProgress(received, total) total is None when the server doesn't say
+    onDone(future)              called once the download finished or failed
+    Both run on a download thread.
+    """
+
+    def __init__(self, maxParallel: int = MAX_PARALLEL):
+        self.maxParallel = maxParallel
+        self._pool = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.maxParallel, thread_name_prefix="hubDownload"
+            )
+        return self._pool
+
+    def download(self, url: str, destination: str, onProgress=None, onDone=None, executor=None):
+        with self._lock:
+            future = self._pending.get(destination)
+            if future is None:
+                future = (executor or self._executor()).submit(self._fetch, url, destination, onProgress)
+                self._pending[destination] = future
+                future.add_done_callback(lambda f: self._forget(destination, f))
+            else:
+                logger.debug(f"already downloading {destination}")
+        if onDone is not None:
+            future.add_done_callback(onDone)
+        return future
+
+    def _forget(self, destination: str, future):
+        with self._lock:
+            if self._pending.get(destination) is future:
+                del self._pending[destination]
+
+    def downloadAll(self, jobs, maxParallel: int, onDone=None) -> list:
+        """
+        Queue (url, destination) pairs on a pool of their own, so a batch
+        runs at most maxParallel at a time and never starves single
+        downloads. Returns the futures in job order.
+        """
+        pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, maxParallel), thread_name_prefix="hubBatch"
+        )
+        try:
+            return [self.download(url, destination, onDone=onDone, executor=pool) for url, destination in jobs]
+        finally:
+            pool.shutdown(wait=False)  # workers exit once the queue drains
+
+    def isDownloading(self, destination: str) -> bool:
+        with self._lock:
+            return destination in self._pending
+
+    def _fetch(self, url: str, destination: str, onProgress=None) -> str:
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        partPath = destination + PART_SUFFIX
+        received = os.path.getsize(partPath) if os.path.exists(partPath) else 0
+
+        headers = {"Range": f"bytes={received}-"} if received else {}
+        with httpClient.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 416 and received:
+                # the .part file already holds the whole body
+                os.replace(partPath, destination)
+                return destination
+            response.raise_for_status()
+
+            if received and response.status_code != 206:
+                logger.debug(f"server ignored Range for {url}, restarting")
+                received = 0
+            mode = "ab" if received else "wb"
+
+            length = response.headers.get("Content-Length")
+            total = received + int(length) if length and length.isdigit() else None
+            if received:
+                logger.info(f"resuming {os.path.basename(destination)} at {received} bytes")
+
+            with open(partPath, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    received += len(chunk)
+                    if onProgress is not None:
+                        onProgress(received, total)
+
+        if total is not None and received < total:
+            raise IOError(f"download of {url} ended early ({received}/{total} bytes)")
+        os.replace(partPath, destination)
+        logger.debug(f"downloaded {url} to {destination} ({received} bytes)")
+        return destination
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+manager = DownloadManager()
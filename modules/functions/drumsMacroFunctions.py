@@ -179,6 +179,7 @@ def startPlayback():
             logger.debug("midiHandler.startPlayback called")
     except Exception as e:
         logger.exception(f"startPlayback error: {e}")
+        stopPlayback()  # the engine didn't start (e.g. no uinput access): reset the buttons
 
 def stopPlayback():
     logger.info("stopPlayback called")
@@ -9,23 +9,51 @@ Hyprland (and other compositors) can do global keybinds reliably.
 This module provides a tiny UNIX-socket server inside the app so
 those keybinds can send commands to nanoMIDIPlayer.
 
-Commands (one per line)
-----------------------
-  play | pause | stop | slow_down | speed_up
-  tab:0 ... tab:4
+Protocol (line-delimited JSON, one request per line)
+----------------------------------------------------
+  -> {"id": 1, "cmd": "pause"}
+  <- {"id": 1, "ok": true, "result": true}
+  -> {"id": 2, "cmd": "speed", "args": {"value": 120}}
+  <- {"id": 2, "ok": false, "error": {"code": "bad_args", "message": "..."}}
+
+A connection may send any number of requests; each gets exactly one
+reply, in order, echoing its id. Many clients may be connected at once.
 
-The handler is implemented in modules.functions.mainFunctions.dispatchIpcCommand.
+Actions (run on the Tk thread, replied to once they ran)
+  play | pause | stop | slow_down | speed_up
+  speed {"value": percent} | tab {"index": 0..4}
+  On the MIDI player tab, pause/stop/speed/slow_down/speed_up skip the
+  Tk queue: they go straight to the engine and the widgets catch up.
+Queries (answered from the IPC thread, no Tk round trip)
+  ping | status | state | position | speed | file | commands
+Streams
+  subscribe {"events": ["state", "position"]}
+    replies once, then keeps the connection open and pushes
+    {"event": "state", ...status} whenever the status changes and
+    {"event": "position", "position": s} while playing, at most
+    appUI.ipcEventRate times per second
+
+Plain-text lines ("pause", "tab:0") from older scripts still work and
+get a JSON reply with "id": null.
+
+The action handler is implemented in modules.functions.mainFunctions.dispatchIpcCommand.
 """
 
 from __future__ import annotations
 
 import os
+import json
+import time
 import socket
+import selectors
 import threading
 import logging
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from modules import configuration
 from modules.functions import mainFunctions
 
 logger = logging.getLogger("modules.functions.ipcFunctions")
@@ -48,13 +76,14 @@ def get_default_socket_path() -> str:
 
 def start(socket_path: str | None = None) -> str:
     """Start the IPC server (idempotent). Returns the socket path."""
-    global _server_thread, _sock_path
+    global _server_thread, _sock_path, _server
 
     if _server_thread and _server_thread.is_alive():
         return _sock_path or get_default_socket_path()
 
     _stop_event.clear()
     _sock_path = socket_path or get_default_socket_path()
+    _server = _Server(_sock_path)
 
     # Ensure directory exists
     try:
@@ -80,87 +109,517 @@ def start_ipc_server(app=None, socket_path: str | None = None) -> str:  # noqa:
 
 
 def stop() -> None:
-    """Stop the IPC server."""
-    global _sock_path
+    """Stop the IPC server. Returns at once; the loop exits on its wakeup fd."""
     _stop_event.set()
+    if _server is not None:
+        _server.wake()
+
+
+# -----------------------------
+# Protocol
+# -----------------------------
+
+# error codes
+BAD_REQUEST = "bad_request"          # not JSON / not an object / no cmd
+UNKNOWN_COMMAND = "unknown_command"
+BAD_ARGS = "bad_args"
+UNAVAILABLE = "unavailable"          # app not up yet, the tab has no such control, or nothing to pause/stop
+TIMEOUT = "timeout"                  # the Tk thread didn't run the action in time
+FAILED = "failed"                    # the handler raised
+
+TK_TIMEOUT = 2.0          # seconds an action may wait for the Tk thread
+CLIENT_TIMEOUT = 10.0     # idle seconds before a non-subscriber connection is dropped
+MAX_LINE = 64 * 1024
+
+ACTIONS = ("play", "pause", "stop", "slow_down", "speed_up", "speed", "tab")
+QUERIES = ("ping", "status", "state", "position", "speed", "file", "commands")
+STREAMS = ("subscribe",)
+# applied from the IPC thread while the MIDI player tab is active
+TRANSPORT = ("pause", "stop", "speed", "slow_down", "speed_up")
+
+
+class IpcError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _parse(line: str):
+    """(id, cmd, args) from a JSON request or a legacy plain-text line."""
+    if not line.startswith("{"):
+        cmd = line.lower()
+        if cmd.startswith("tab:"):
+            return None, "tab", {"index": cmd.split(":", 1)[1]}
+        return None, cmd, {}
+
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        raise IpcError(BAD_REQUEST, f"invalid JSON: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get("cmd"), str):
+        raise IpcError(BAD_REQUEST, "expected an object with a string 'cmd'")
+    args = request.get("args") or {}
+    if not isinstance(args, dict):
+        raise IpcError(BAD_REQUEST, "'args' must be an object")
+    return request.get("id"), request["cmd"].strip().lower(), args
+
+
+def _status() -> dict:
+    from modules.functions import midiPlayerFunctions
+
+    status = midiPlayerFunctions.playbackStatus()
+    app = mainFunctions.getApp()
+    status["tab"] = getattr(app, "currentPage", None) if app else None
+    return status
+
+
+def _query(cmd: str, args: dict):
+    if cmd == "ping":
+        return "pong"
+    if cmd == "commands":
+        return {"actions": list(ACTIONS), "queries": list(QUERIES), "streams": list(STREAMS)}
+    status = _status()
+    if cmd == "status":
+        return status
+    return status[cmd]
 
-    # Nudge accept() by connecting once
-    if _sock_path and os.path.exists(_sock_path):
+
+def _run_on_tk(fn):
+    """Run fn() on the Tk thread and return its result (raises IpcError)."""
+    app = mainFunctions.getApp()
+    if not app:
+        raise IpcError(UNAVAILABLE, "the app is not running yet")
+
+    done = threading.Event()
+    outcome = {}
+
+    def call():
         try:
-            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
-                s.settimeout(0.1)
-                s.connect(_sock_path)
-                s.sendall(b"\n")
-        except Exception:
-            pass
+            outcome["result"] = fn()
+        except Exception as e:  # reported to the client
+            outcome["error"] = e
+        finally:
+            done.set()
 
+    try:
+        app.after(0, call)
+    except Exception as e:
+        raise IpcError(UNAVAILABLE, f"Tk is not accepting work: {e}")
+    if not done.wait(TK_TIMEOUT):
+        raise IpcError(TIMEOUT, f"the UI did not run the command within {TK_TIMEOUT:.0f}s")
+    if "error" in outcome:
+        raise IpcError(FAILED, f"{type(outcome['error']).__name__}: {outcome['error']}")
+    return outcome.get("result")
 
-def _run_server() -> None:
-    assert _sock_path is not None
 
-    # Remove stale socket
+def _on_player(cmd: str) -> bool:
+    """True when cmd is a transport command the MIDI player tab would handle."""
+    app = mainFunctions.getApp()
+    return cmd in TRANSPORT and app is not None and mainFunctions.ipcRoute(app) == "midiPlayer"
+
+
+def _transport(cmd: str, args: dict) -> bool:
+    """
+    Apply a MIDI player transport command on this thread, straight to the
+    engine, then let Tk redraw the widgets whenever it gets to it.
+    """
+    from modules.functions import midiPlayerFunctions as player
+
+    message = None
+    if cmd == "pause":
+        paused = player.applyPause()
+        if paused is None:
+            raise IpcError(UNAVAILABLE, "nothing is playing")
+        message = "Paused" if paused else "Resumed"
+    elif cmd == "stop":
+        if not player.applyStop():
+            raise IpcError(UNAVAILABLE, "nothing is playing")
+        message = "Stopped."
+    else:
+        if cmd == "speed":
+            value = args["value"]
+        else:
+            step = configuration.configData["midiPlayer"]["decreaseSize"]
+            value = player.playback_state.speed + (step if cmd == "speed_up" else -step)
+        player.applySpeed(value)
+
     try:
-        if os.path.exists(_sock_path):
-            os.remove(_sock_path)
-    except Exception:
-        pass
+        mainFunctions.getApp().after(0, player.syncTransportUI)
+    except Exception as e:
+        logger.debug("IPC could not schedule the UI sync: %s", e)
+    if message:
+        mainFunctions.log(message)
+    return True
 
-    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as srv:
-        srv.bind(_sock_path)
-        srv.listen(5)
-        srv.settimeout(0.5)
 
-        # Make socket user-only by default
+def _action(cmd: str, args: dict):
+    if cmd == "speed":
         try:
-            os.chmod(_sock_path, 0o600)
-        except Exception:
-            pass
+            args = {"value": float(args["value"])}
+        except (KeyError, TypeError, ValueError):
+            raise IpcError(BAD_ARGS, "speed needs a numeric 'value' (percent)")
+    if _on_player(cmd):
+        return _transport(cmd, args)
 
-        while not _stop_event.is_set():
+    if cmd == "tab":
+        try:
+            index = int(args.get("index"))
+        except (TypeError, ValueError):
+            raise IpcError(BAD_ARGS, "tab needs an integer 'index'")
+        handled = _run_on_tk(lambda: mainFunctions.dispatchIpcCommand(f"tab:{index}"))
+    elif cmd == "speed":
+        from modules.functions import midiPlayerFunctions
+        handled = _run_on_tk(lambda: midiPlayerFunctions.setSpeed(args["value"]) or True)
+    else:
+        handled = _run_on_tk(lambda: mainFunctions.dispatchIpcCommand(cmd))
+
+    if not handled:
+        raise IpcError(UNAVAILABLE, f"'{cmd}' is not available on the current tab")
+    return True
+
+
+def handle_request(line: str) -> dict:
+    """Reply (a dict) for one request line. Never raises."""
+    request_id = None
+    try:
+        request_id, cmd, args = _parse(line)
+        if cmd == "speed" and not args:
+            result = _query(cmd, args)
+        elif cmd in ACTIONS:
+            result = _action(cmd, args)
+        elif cmd in QUERIES:
+            result = _query(cmd, args)
+        else:
+            raise IpcError(UNKNOWN_COMMAND, f"unknown command '{cmd}'")
+        return {"id": request_id, "ok": True, "result": result}
+    except IpcError as e:
+        return {"id": request_id, "ok": False, "error": {"code": e.code, "message": e.message}}
+    except Exception as e:
+        logger.exception("IPC request failed: %s", line)
+        return {"id": request_id, "ok": False, "error": {"code": FAILED, "message": str(e)}}
+
+
+def encode_reply(reply: dict) -> bytes:
+    return (json.dumps(reply, default=str) + "\n").encode("utf-8")
+
+
+# -----------------------------
+# Server
+# -----------------------------
+# One thread and one selector serve every client. Sockets are
+# non-blocking: input is split into lines as it arrives, replies and
+# events go through a per-client output buffer, and actions (which wait
+# for the Tk thread) run on a small pool so a busy UI never stalls the
+# loop. Each connection still gets its replies in request order.
+
+DEFAULT_EVENT_RATE = 4.0     # events per second when appUI.ipcEventRate is unset
+MAX_EVENT_RATE = 60.0
+MAX_BACKLOG = 256 * 1024     # bytes queued for a subscriber before it is dropped
+EVENT_KINDS = ("state", "position")
+ACTION_WORKERS = 2
+IDLE_CHECK = 1.0             # seconds between idle sweeps when nobody is subscribed
+
+
+def _kind(line: str) -> str:
+    """
+    "stream", "action" (may block, runs on the pool) or "inline" (queries,
+    errors and the player's non-blocking transport commands).
+    """
+    try:
+        _request_id, cmd, args = _parse(line)
+    except IpcError:
+        return "inline"
+    if cmd in STREAMS:
+        return "stream"
+    if cmd in ACTIONS and not (cmd == "speed" and not args):
+        # stop joins the play thread, so it still gets a pool worker
+        return "inline" if cmd != "stop" and _on_player(cmd) else "action"
+    return "inline"
+
+
+def _event_rate() -> float:
+    try:
+        rate = float(configuration.configData["appUI"].get("ipcEventRate", DEFAULT_EVENT_RATE))
+    except (TypeError, ValueError):
+        rate = DEFAULT_EVENT_RATE
+    return max(0.5, min(MAX_EVENT_RATE, rate))
+
+
+class _Client:
+    __slots__ = ("sock", "inbox", "lines", "out", "busy", "events", "eof", "registered", "lastActive")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbox = b""          # bytes after the last newline
+        self.lines = deque()      # complete lines waiting for their turn
+        self.out = bytearray()
+        self.busy = False         # an action is running for this client
+        self.events = ()          # event kinds it subscribed to
+        self.eof = False          # the client finished sending
+        self.registered = True    # currently in the selector
+        self.lastActive = time.monotonic()
+
+    def idle(self) -> bool:
+        return not (self.lines or self.busy or self.out)
+
+
+class _Server:
+    def __init__(self, path: str):
+        self.path = path
+        self.sel = selectors.DefaultSelector()
+        self.clients = {}
+        self.wakeR, self.wakeW = socket.socketpair()
+        self.wakeR.setblocking(False)
+        self.wakeW.setblocking(False)
+        self.finished = deque()   # (client, reply) from action workers
+        self.pool = ThreadPoolExecutor(max_workers=ACTION_WORKERS, thread_name_prefix="nanoMIDIPlayer-IPC-action")
+        self.lastState = None
+        self.lastStatus = None
+        self.nextTick = time.monotonic()
+
+    def wake(self) -> None:
+        try:
+            self.wakeW.send(b"\0")
+        except OSError:
+            pass  # buffer full: the loop is already due to wake up
+
+    # -- connections --
+
+    def accept(self, srv: socket.socket) -> None:
+        while True:
             try:
                 conn, _ = srv.accept()
-            except socket.timeout:
-                continue
-            except Exception as e:
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
                 logger.debug("IPC accept error: %s", e)
+                return
+            conn.setblocking(False)
+            client = _Client(conn)
+            self.clients[conn] = client
+            self.sel.register(conn, selectors.EVENT_READ, client)
+
+    def drop(self, client: _Client) -> None:
+        if self.clients.pop(client.sock, None) is None:
+            return
+        if client.registered:
+            self.sel.unregister(client.sock)
+        client.sock.close()
+
+    def watch(self, client: _Client) -> None:
+        """Select for what the client is waiting on; close it once it is done."""
+        mask = 0 if client.eof else selectors.EVENT_READ
+        if client.out:
+            mask |= selectors.EVENT_WRITE
+        if mask and client.registered:
+            self.sel.modify(client.sock, mask, client)
+        elif mask:
+            self.sel.register(client.sock, mask, client)
+            client.registered = True
+        elif client.idle():
+            self.drop(client)
+        elif client.registered:
+            self.sel.unregister(client.sock)  # waiting for an action, nothing to select on
+            client.registered = False
+
+    def send(self, client: _Client, message: dict) -> None:
+        client.out += encode_reply(message)
+        self.watch(client)
+
+    def read(self, client: _Client) -> None:
+        try:
+            data = client.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        client.lastActive = time.monotonic()
+
+        if data:
+            client.inbox += data
+            if len(client.inbox) > MAX_LINE and b"\n" not in client.inbox:
+                client.inbox, client.eof = b"", True
+                self.send(client, {"id": None, "ok": False, "error": {"code": BAD_REQUEST, "message": "line too long"}})
+                return
+        elif client.events:
+            self.drop(client)  # a subscriber hanging up
+            return
+        else:
+            client.inbox += b"\n"  # a last line without a newline still counts
+            client.eof = True
+
+        *lines, client.inbox = client.inbox.split(b"\n")
+        for raw in lines:
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if line:
+                client.lines.append(line)
+        self.process(client)
+        self.watch(client)
+
+    def write(self, client: _Client) -> None:
+        try:
+            sent = client.sock.send(client.out)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.drop(client)  # fire-and-forget clients hang up before the reply
+            return
+        del client.out[:sent]
+        if not client.out:
+            self.watch(client)
+
+    # -- requests --
+
+    def process(self, client: _Client) -> None:
+        """Answer queued lines until an action has to wait for the Tk thread."""
+        while client.lines and not client.busy:
+            line = client.lines.popleft()
+            kind = _kind(line)
+            if kind == "stream":
+                self.subscribe(client, line)
+            elif kind == "action":
+                client.busy = True
+                future = self.pool.submit(handle_request, line)
+                future.add_done_callback(lambda f, c=client: self.actionDone(c, f))
+            else:
+                client.out += encode_reply(handle_request(line))
+
+    def actionDone(self, client: _Client, future) -> None:
+        # worker thread: hand the reply back to the loop
+        try:
+            reply = future.result()
+        except Exception as e:
+            reply = {"id": None, "ok": False, "error": {"code": FAILED, "message": str(e)}}
+        self.finished.append((client, reply))
+        self.wake()
+
+    def drainFinished(self) -> None:
+        while self.finished:
+            client, reply = self.finished.popleft()
+            client.busy = False
+            if client.sock not in self.clients:
                 continue
+            client.out += encode_reply(reply)
+            self.process(client)
+            self.watch(client)
+
+    def subscribe(self, client: _Client, line: str) -> None:
+        request_id, _cmd, args = _parse(line)
+        events = args.get("events") or EVENT_KINDS
+        if isinstance(events, str):
+            events = [events]
+        client.events = tuple(e for e in events if e in EVENT_KINDS)
+        client.out += encode_reply({"id": request_id, "ok": True, "result": {"events": list(client.events), "rate": _event_rate()}})
+        if "state" in client.events and self.lastStatus is not None:
+            client.out += encode_reply({"event": "state", **self.lastStatus})
+
+    # -- events --
+
+    def tick(self) -> None:
+        subscribers = [c for c in self.clients.values() if c.events]
+        if not subscribers:
+            self.lastState = self.lastStatus = None  # the next subscriber starts from a fresh sample
+            return
+        try:
+            status = _status()
+        except Exception as e:
+            logger.debug("IPC status for subscribers failed: %s", e)
+            return
+
+        state = {k: v for k, v in status.items() if k != "position"}
+        changed = state != self.lastState
+        self.lastState, self.lastStatus = state, status
+        for client in subscribers:
+            if len(client.out) > MAX_BACKLOG:
+                logger.debug("IPC subscriber too slow, dropping it")
+                self.drop(client)
+                continue
+            if changed and "state" in client.events:
+                client.out += encode_reply({"event": "state", **status})
+            if status["state"] == "playing" and "position" in client.events:
+                client.out += encode_reply({"event": "position", "position": status["position"]})
+            self.watch(client)
+
+    def sweep(self, now: float) -> None:
+        for client in list(self.clients.values()):
+            if client.idle() and not client.events and now - client.lastActive > CLIENT_TIMEOUT:
+                self.drop(client)
+
+    # -- loop --
+
+    def run(self, srv: socket.socket) -> None:
+        srv.setblocking(False)
+        self.sel.register(srv, selectors.EVENT_READ, "accept")
+        self.sel.register(self.wakeR, selectors.EVENT_READ, "wake")
+        nextSweep = time.monotonic() + IDLE_CHECK
+        try:
+            while not _stop_event.is_set():
+                now = time.monotonic()
+                timeout = nextSweep - now
+                if any(c.events for c in self.clients.values()):
+                    timeout = min(timeout, self.nextTick - now)
+
+                for key, mask in self.sel.select(max(0.0, timeout)):
+                    if key.data == "accept":
+                        self.accept(srv)
+                    elif key.data == "wake":
+                        try:
+                            self.wakeR.recv(4096)
+                        except OSError:
+                            pass
+                    else:
+                        client = key.data
+                        if mask & selectors.EVENT_READ:
+                            self.read(client)
+                        if mask & selectors.EVENT_WRITE and client.sock in self.clients:
+                            self.write(client)
+                self.drainFinished()
+
+                now = time.monotonic()
+                if now >= self.nextTick:
+                    self.nextTick = now + 1.0 / _event_rate()
+                    self.tick()
+                if now >= nextSweep:
+                    nextSweep = now + IDLE_CHECK
+                    self.sweep(now)
+        finally:
+            for client in list(self.clients.values()):
+                self.drop(client)
+            self.pool.shutdown(wait=False)
+            self.sel.close()
+            self.wakeR.close()
+            self.wakeW.close()
+
+
+_server: _Server | None = None
 
-            with conn:
-                try:
-                    data = conn.recv(4096)
-                except Exception:
-                    continue
-
-                if not data:
-                    continue
-
-                # Can contain multiple lines
-                try:
-                    text = data.decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
 
-                for line in text.splitlines():
-                    cmd = line.strip()
-                    if not cmd:
-                        continue
-                    _dispatch_to_tk(cmd)
+def _run_server() -> None:
+    assert _server is not None
 
-    # Cleanup
+    # Remove stale socket
     try:
-        if _sock_path and os.path.exists(_sock_path):
-            os.remove(_sock_path)
+        if os.path.exists(_server.path):
+            os.remove(_server.path)
     except Exception:
         pass
 
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as srv:
+        srv.bind(_server.path)
+        srv.listen(16)
 
-def _dispatch_to_tk(cmd: str) -> None:
-    app = mainFunctions.getApp()
-    if not app:
-        return
+        # Make socket user-only by default
+        try:
+            os.chmod(_server.path, 0o600)
+        except Exception:
+            pass
+
+        _server.run(srv)
 
-    # Ensure Tk-thread execution
+    # Cleanup
     try:
-        app.after(0, lambda: mainFunctions.dispatchIpcCommand(cmd))
-    except Exception as e:
-        logger.debug("IPC dispatch failed: %s", e)
+        if os.path.exists(_server.path):
+            os.remove(_server.path)
+    except Exception:
+        pass
@@ -112,14 +112,25 @@ def getApp():
 # IPC command dispatcher
 # -----------------------------
 
+def ipcRoute(app) -> str:
+    """Which tab's controls IPC transport commands drive. Safe off the Tk thread."""
+    current = getattr(app, "currentPage", 0)
+    if current == 1:
+        return "drumsMacro"
+    if current == 3:
+        return "midiToQWERTY"
+    return "midiPlayer"
+
+
 def dispatchIpcCommand(cmd: str):
     """Handle a command coming from the IPC server.
 
-    This runs on the Tk main thread (scheduled via app.after).
+    This runs on the Tk main thread (scheduled via app.after). Returns
+    True when a handler ran, so the IPC server can report it.
     """
     app = getApp()
     if not app:
-        return
+        return False
 
     cmd = (cmd or "").strip().lower()
 
@@ -128,41 +139,41 @@ def dispatchIpcCommand(cmd: str):
         try:
             idx = int(cmd.split(":", 1)[1])
         except Exception:
-            return
+            return False
         try:
             app.showFrame(idx)
         except Exception:
-            pass
-        return
+            return False
+        return True
 
     # Active tab routing
-    current = getattr(app, "currentPage", 0)
+    current = ipcRoute(app)
 
     try:
-        if current == 1:
+        if current == "drumsMacro":
             from modules.functions import drumsMacroFunctions as _drums
             _route = _drums
-        elif current == 3:
+        elif current == "midiToQWERTY":
             from modules.functions import midiToQWERTYFunctions as _m2q
             _route = _m2q
         else:
             from modules.functions import midiPlayerFunctions as _midi
             _route = _midi
     except Exception:
-        return
+        return False
 
     # Common controls (map to whichever module has them)
     mapping = {
         "play": ["playButton", "play", "startPlayback"],
         "pause": ["pausePlayback", "pause", "togglePause"],
         "stop": ["stopPlayback", "stop"],
-        "slow_down": ["slowDownPlayback", "slowDown"],
-        "speed_up": ["speedUpPlayback", "speedUp"],
+        "slow_down": ["slowDownPlayback", "slowDown", "decreaseSpeed"],
+        "speed_up": ["speedUpPlayback", "speedUp", "increaseSpeed"],
     }
 
     candidates = mapping.get(cmd)
     if not candidates:
-        return
+        return False
 
     for name in candidates:
         fn = getattr(_route, name, None)
@@ -177,7 +188,8 @@ def dispatchIpcCommand(cmd: str):
                     pass
             except Exception:
                 pass
-            break
+            return True
+    return False
 
 
 def scheduleIpcCommand(cmd: str):
@@ -6,12 +6,15 @@ import datetime
 import requests
 import concurrent.futures
 import customtkinter as ctk
-import textwrap
 import logging
-from PIL import Image
-from mido import MidiFile
 from modules import configuration
+from modules import httpClient
+from modules import hubCache
+from modules import hubCatalog
+from modules import downloadManager
+from modules import library
 import ui.customTheme as customTheme
+from ui.widget.midiCard import MidiCard
 from modules.functions import mainFunctions
 
 logger = logging.getLogger(__name__)
@@ -22,43 +25,84 @@ documentsDir = os.path.join(os.path.expanduser("~"), "Documents")
 baseDirectory = os.path.join(documentsDir, "nanoMIDIPlayer")
 os.makedirs(baseDirectory, exist_ok=True)
 
-midiDataUrl = "https://api.nanomidi.net/api/midiData"
+midiDataUrl = hubCache.catalogUrl
 pageSize = 10
 currentPage = 1
 downloadFolder = os.path.join(baseDirectory, "Midis")
 allMidiData = None
 totalPages = None
 filteredData = None
+catalogIndex = None    # hubCatalog.CatalogIndex over allMidiData
+lastQuery = ""
+sortOrder = None       # a hubCatalog.SORT_KEYS name, None = catalog order
+searchAfterId = None
+SEARCH_DEBOUNCE_MS = 150
+thumbnailPool = None   # shared by the current page and the prefetcher
+thumbnailFutures = {}  # imageFilename -> in-flight download, so a page and its prefetch share one
+thumbnailLock = threading.Lock()
+renderToken = 0        # bumped by every showPage
+cardPool = []          # MidiCards reused by every page, at most pageSize
+footerFrame = None     # pagination bar, built once
+footerLabel = None
+bulkDownloading = False
 
 os.makedirs(downloadFolder, exist_ok=True)
 
 def searchBar(event=None):
     logger.info("searchBar called")
     try:
-        threading.Thread(target=filteredMidiData).start()
+        filteredMidiData()
     except Exception as e:
         logger.exception(f"searchBar error: {e}")
 
+def searchAsYouType(event=None):
+    """Re-run the search shortly after typing pauses (the index itself is instant)."""
+    global searchAfterId
+    try:
+        from ui.midiHub import MidiHubTab
+        if searchAfterId is not None:
+            MidiHubTab.searchEntry.after_cancel(searchAfterId)
+        searchAfterId = MidiHubTab.searchEntry.after(SEARCH_DEBOUNCE_MS, filteredMidiData)
+    except Exception as e:
+        logger.exception(f"searchAsYouType error: {e}")
+
 def sortComboCommand(value):
     logger.info(f"sortComboCommand called with value: {value}")
     try:
-        threading.Thread(target=sortMidiData, args=(value,)).start()
+        sortMidiData(value)
     except Exception as e:
         logger.exception(f"sortComboCommand error: {e}")
 
 def loadMidiData():
     logger.info("loadMidiData called")
-    clearList()
+    hadData = allMidiData is not None
+    if hadData:
+        # in-memory copy from an earlier visit
+        showPage(currentPage)
+    else:
+        clearList()
+
     def worker():
-        global allMidiData, totalPages, filteredData
         from ui.midiHub import MidiHubTab
+        shown = hadData
+        if not shown:
+            cached = hubCache.cachedCatalog()
+            if cached is not None:
+                catalog = hubCatalog.CatalogIndex(list(reversed(cached)))
+                MidiHubTab.mainScrollFrame.after(0, applyCatalog, catalog)
+                shown = True
+        if shown and not hubCache.needsRevalidation():
+            return
+
         try:
-            logger.debug(f"Requesting {midiDataUrl}")
-            response = requests.get(midiDataUrl, timeout=10)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
+            logger.debug(f"Revalidating {midiDataUrl}")
+            data, changed = hubCache.fetchCatalog()
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.warning(f"Failed to load MIDI data: {e}")
-            def errorUi(err=e):
+            if shown:
+                return  # keep showing the cached catalog
+
+            def errorUi(err):
                 for widget in MidiHubTab.mainScrollFrame.winfo_children():
                     info = widget.grid_info()
                     if info and int(info.get("row", 1)) > 0:
@@ -81,157 +125,202 @@ def loadMidiData():
                     compound="left", font=customTheme.globalFont14
                 )
                 pleaseWait2.grid(row=2, column=0, padx=10, pady=(0,0), sticky="new")
-            MidiHubTab.mainScrollFrame.after(0, errorUi)
+            MidiHubTab.mainScrollFrame.after(0, errorUi, e)
             return
 
-        try:
-            allMidiData = response.json()
-            logger.debug(f"Fetched {len(allMidiData)} MIDI entries")
-            allMidiData.reverse()
-            filteredData = allMidiData
-            totalPages = (len(filteredData) + pageSize - 1) // pageSize
-            showPage(currentPage)
-        except Exception as e:
-            logger.exception(f"Parsing response error: {e}")
+        if changed or not shown:
+            # index off the Tk thread, then swap it in
+            catalog = hubCatalog.CatalogIndex(list(reversed(data)))
+            MidiHubTab.mainScrollFrame.after(0, applyCatalog, catalog)
 
     threading.Thread(target=worker, daemon=True).start()
 
+def applyCatalog(catalog):
+    """Show a (new) catalog, keeping the current search; runs on the Tk thread."""
+    global allMidiData, catalogIndex, lastQuery, currentPage
+    try:
+        from ui.midiHub import MidiHubTab
+        catalogIndex = catalog
+        allMidiData = catalog.entries
+        logger.debug(f"Applying {len(allMidiData)} MIDI entries")
+        lastQuery = MidiHubTab.searchEntry.get()
+        applySearch(lastQuery)
+        currentPage = max(1, min(currentPage, totalPages))
+        showPage(currentPage)
+    except Exception as e:
+        logger.exception(f"applyCatalog error: {e}")
+
+def applySearch(query):
+    """Point filteredData at the entries matching query (all entries when it is empty), in sortOrder."""
+    global filteredData, totalPages
+    filteredData = catalogIndex.view(query, sortOrder)
+    totalPages = (len(filteredData) + pageSize - 1) // pageSize
+
 def fetchImage(midi):
     try:
-        imageUrl = f"https://api.nanomidi.net/api/v2/images/{midi['imageFilename']}?size=100x100"
-        logger.debug(f"Fetching image {imageUrl}")
-        response = requests.get(imageUrl, stream=True)
-        return ctk.CTkImage(Image.open(response.raw), size=(100, 100))
+        return hubCache.thumbnail(midi["imageFilename"])
     except Exception as e:
         logger.exception(f"fetchImage error for {midi.get('imageFilename')}: {e}")
         return None
 
 def sortMidiData(selectedValue):
     logger.info(f"sortMidiData called with {selectedValue}")
-    global totalPages, filteredData
+    global sortOrder
     try:
-        clearList()
-        if selectedValue == "Newest":
-            filteredData = sorted(allMidiData, key=lambda x: x["id"], reverse=True)
-        elif selectedValue == "Oldest":
-            filteredData = sorted(allMidiData, key=lambda x: x["id"])
-        elif selectedValue == "Downloads":
-            filteredData = sorted(allMidiData, key=lambda m: m.get("downloads", 0), reverse=True)
-        elif selectedValue == "Views":
-            filteredData = sorted(allMidiData, key=lambda m: m.get("views", 0), reverse=True)
-        else:
-            filteredData = allMidiData
-
-        totalPages = (len(filteredData) + pageSize - 1) // pageSize
+        if catalogIndex is None:
+            return
+        # a precomputed permutation; composes with the current search
+        sortOrder = selectedValue if selectedValue in hubCatalog.SORT_KEYS else None
+        applySearch(lastQuery)
         showPage(currentPage)
     except Exception as e:
         logger.exception(f"sortMidiData error: {e}")
 
+def _thumbnailPool():
+    global thumbnailPool
+    if thumbnailPool is None:
+        thumbnailPool = concurrent.futures.ThreadPoolExecutor(max_workers=6, thread_name_prefix="hubThumbnail")
+    return thumbnailPool
+
+def fetchThumbnail(midi):
+    """Future for midi's thumbnail, joining a download already in flight for it."""
+    name = midi["imageFilename"]
+    with thumbnailLock:
+        future = thumbnailFutures.get(name)
+        if future is not None:
+            return future
+        future = _thumbnailPool().submit(fetchImage, midi)
+        thumbnailFutures[name] = future
+    # outside the lock: a future that's already done runs this right here
+    future.add_done_callback(lambda f: _forgetThumbnail(name, f))
+    return future
+
+def _forgetThumbnail(name, future):
+    with thumbnailLock:
+        if thumbnailFutures.get(name) is future:
+            del thumbnailFutures[name]
+
+def pageEntries(page):
+    startIndex = (page - 1) * pageSize
+    return filteredData[startIndex:startIndex + pageSize]
+
+def prefetchPage(page):
+    """Warm the thumbnail cache for a page the user is likely to open next."""
+    if not filteredData or page < 1 or page > (totalPages or 0):
+        return
+    for midi in pageEntries(page):
+        if hubCache.cachedThumbnail(midi["imageFilename"]) is None:
+            fetchThumbnail(midi)
+
 def showPage(page):
+    global renderToken
     logger.info(f"showPage called with page {page}")
-    clearList()
-    def worker():
-        global filteredData
+    renderToken += 1
+    token = renderToken
+
+    def setImage(card, imageFilename, future):
+        # skip cards that have been given another entry since
+        if token != renderToken or card.imageFilename != imageFilename or not card.winfo_exists():
+            return
+        midiImage = future.result()
+        if midiImage is not None:
+            card.setImage(midiImage)
+
+    def render():
         from ui.midiHub import MidiHubTab
         try:
-            startIndex = (page - 1) * pageSize
-            endIndex = min(startIndex + pageSize, len(filteredData))
-            logger.debug(f"Rendering entries {startIndex} to {endIndex}")
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                results = [(midi, executor.submit(fetchImage, midi)) for midi in filteredData[startIndex:endIndex]]
-            def render():
-                if hasattr(MidiHubTab, "loadingFrame"):
-                    MidiHubTab.loadingFrame.destroy()
-                for index, (midi, future) in enumerate(results, start=1):
-                    try:
-                        midiImage = future.result()
-                    except Exception as e:
-                        logger.debug(f"Image fetch failed for {midi.get('name')}: {e}")
-                        midiImage = None
-                    createMidiFrame(index, midi, midiImage)
-                midiHubFooter()
-            MidiHubTab.mainScrollFrame.after(0, render)
+            entries = pageEntries(page)
+            logger.debug(f"Rendering {len(entries)} entries of page {page}")
+            MidiHubTab.mainScrollFrame._parent_canvas.yview_moveto(0)
+            removeTransientWidgets()
+
+            # the pooled cards are refilled in place; thumbnails fill in as each one arrives
+            for index, midi in enumerate(entries, start=1):
+                midiImage = hubCache.cachedThumbnail(midi["imageFilename"])
+                card = createMidiFrame(index, midi, midiImage)
+                if midiImage is None and card is not None:
+                    future = fetchThumbnail(midi)
+                    future.add_done_callback(
+                        lambda f, card=card, name=midi["imageFilename"]: MidiHubTab.mainScrollFrame.after(0, setImage, card, name, f)
+                    )
+            for card in cardPool[len(entries):]:
+                card.grid_remove()
+            midiHubFooter()
+
+            prefetchPage(page + 1)
+            prefetchPage(page - 1)
         except Exception as e:
-            logger.exception(f"showPage worker error: {e}")
-    threading.Thread(target=worker, daemon=True).start()
+            logger.exception(f"showPage render error: {e}")
 
-def createMidiFrame(row, midi, midiImage):
     from ui.midiHub import MidiHubTab
-    logger.debug(f"Creating frame for {midi.get('name')} at row {row}")
-    try:
-        def wrapText(text, width):
-            return "\n".join(textwrap.wrap(text, width=width, break_long_words=True))
-
-        nameText = wrapText(midi["name"], 28)
-        artistText = wrapText(midi["artists"], 36)
-        arrText = "Arr: " + (wrapText(midi["arranger"], 36) if midi["arranger"] else "N/A")
-        uploaderText = "Uploader: " + wrapText(midi["uploader"], 36)
-
-        nameLines = nameText.count("\n") + 1
-        artistLines = artistText.count("\n") + 1
-        arrLines = arrText.count("\n") + 1
-        uploaderLines = uploaderText.count("\n") + 1
-        totalLines = nameLines + artistLines + arrLines + uploaderLines
-        frameHeight = max(100, 40 + totalLines * 18)
-
-        midiFrame = ctk.CTkFrame(
-            master=MidiHubTab.mainScrollFrame,
-            height=frameHeight,
-            fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["MidiCardBackColor"]
-        )
-        midiFrame.grid(row=row, column=0, padx=20, pady=5, sticky="nsew")
+    MidiHubTab.mainScrollFrame.after(0, render)
 
-        midiImageButton = ctk.CTkButton(
-            master=midiFrame, text="", fg_color="transparent", width=100, height=100,
-            state="disabled", image=midiImage
-        )
-        midiImageButton.grid(row=0, column=0, sticky="w")
-
-        ctk.CTkLabel(
-            midiFrame, text=nameText,
-            font=customTheme.globalFont14, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            anchor="w", justify="left"
-        ).grid(row=0, column=0, padx=120, pady=(0, 80 + (nameLines - 1) * 18), sticky="w")
-
-        ctk.CTkLabel(
-            midiFrame, text=artistText,
-            font=customTheme.globalFont12, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            anchor="w", justify="left"
-        ).grid(row=0, column=0, padx=120, pady=(0, 35 + (artistLines - 1) * 18), sticky="w")
-
-        ctk.CTkLabel(
-            midiFrame, text=arrText,
-            font=customTheme.globalFont11, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            anchor="w", justify="left"
-        ).grid(row=0, column=0, padx=120, pady=(40 + (arrLines - 1) * 18, 0), sticky="w")
-
-        ctk.CTkLabel(
-            midiFrame, text=uploaderText,
-            font=customTheme.globalFont11, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            anchor="w", justify="left"
-        ).grid(row=0, column=0, padx=120, pady=(80 + (uploaderLines - 1) * 18, 0), sticky="w")
+def midiCard(index):
+    """The pooled card for a 0-based slot on the page, built on first use."""
+    from ui.midiHub import MidiHubTab
+    if index < len(cardPool) and cardPool[index].winfo_exists():
+        return cardPool[index]
+    card = MidiCard(MidiHubTab.mainScrollFrame)
+    if index < len(cardPool):
+        cardPool[index] = card
+    else:
+        cardPool.append(card)
+    return card
 
+def createMidiFrame(row, midi, midiImage):
+    logger.debug(f"Showing {midi.get('name')} at row {row}")
+    try:
+        card = midiCard(row - 1)
         midiFilename = midi["midiFilename"]
+        onDownload = None
         if midiFilename:
-            downloadUrl = "https://api.nanomidi.net/api/midis/" + midiFilename
-            ctk.CTkButton(
-                master=midiFrame, text="", width=24, height=24,
-                fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["DownloadButtonColor"],
-                hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["DownloadButtonHoverColor"],
-                image=customTheme.downloadImageFile,
-                command=lambda url=downloadUrl: downloadMidi(url)
-            ).grid(row=0, column=0, padx=345, pady=(75 + (totalLines - 4) * 18, 0), sticky="e")
+            downloadUrl = f"{httpClient.API_BASE}/api/midis/" + midiFilename
+            onDownload = lambda url=downloadUrl: downloadMidi(url)
+        card.show(midi, midiImage, onDownload)
+        card.grid(row=row, column=0, padx=20, pady=5, sticky="nsew")
+        return card
     except Exception as e:
         logger.exception(f"createMidiFrame error: {e}")
+        return None
 
 def downloadMidi(url):
+    """Queue a hub MIDI on the download manager; the player is updated once it is on disk."""
     logger.info(f"downloadMidi called with url {url}")
     try:
-        from ui.midiPlayer import MidiPlayerTab
-        app = mainFunctions.getApp()
-        response = requests.get(url)
+        from ui.midiHub import MidiHubTab
         filename = url.split("/")[-1]
         filepath = os.path.join(downloadFolder, filename)
+        mainFunctions.log(f"Downloading {filename}...")
+
+        progress = {"step": 0}
+
+        def onProgress(received, total):
+            # a console line per quarter; the console is rate limited anyway
+            if total:
+                step = received * 4 // total
+                if step > progress["step"] and step < 4:
+                    progress["step"] = step
+                    mainFunctions.log(f"{filename}: {step * 25}%")
+
+        def onDone(future):
+            try:
+                future.result()
+                totalTime = library.refresh(filepath)["duration"] or 0.0  # indexed here, not on the Tk thread
+            except Exception as e:
+                logger.exception(f"downloadMidi error: {e}")
+                mainFunctions.log(f"Download failed: {filename} ({e.__class__.__name__})")
+                return
+            MidiHubTab.mainScrollFrame.after(0, downloadFinished, filepath, totalTime)
+
+        downloadManager.manager.download(url, filepath, onProgress=onProgress, onDone=onDone)
+    except Exception as e:
+        logger.exception(f"downloadMidi error: {e}")
+
+def downloadFinished(filepath, totalTime):
+    """Select a freshly downloaded MIDI in the player; runs on the Tk thread."""
+    try:
+        from ui.midiPlayer import MidiPlayerTab
+        app = mainFunctions.getApp()
 
         configuration.configData['midiPlayer']['currentFile'] = filepath
         midi_list = configuration.configData['midiPlayer'].get('midiList', [])
@@ -240,18 +329,13 @@ def downloadMidi(url):
         configuration.configData['midiPlayer']['midiList'] = midi_list
         configuration.configData.save()
 
-        with open(filepath, "wb") as f:
-            f.write(response.content)
-
         currentValues = list(MidiPlayerTab.filePathEntry.cget("values"))
         if filepath not in currentValues:
             currentValues.append(filepath)
             MidiPlayerTab.filePathEntry.configure(values=currentValues)
         MidiPlayerTab.filePathEntry.set(filepath)
-        
+
         app.showFrame("midi")
-        midiFile = MidiFile(filepath, clip=True)
-        totalTime = midiFile.length
         timelineText = (
             f"0:00:00 / {str(datetime.timedelta(seconds=int(totalTime)))}"
             if configuration.configData['appUI']['timestamp']
@@ -259,28 +343,105 @@ def downloadMidi(url):
         )
         MidiPlayerTab.timelineIndicator.configure(text=timelineText)
 
-        threading.Thread(target=mainFunctions.log, args=("Downloaded MIDI File:",)).start()
-        threading.Thread(target=mainFunctions.log, args=(filepath,)).start()
+        mainFunctions.log("Downloaded MIDI File:")
+        mainFunctions.log(filepath)
         logger.debug(f"Downloaded and saved to {filepath}")
     except Exception as e:
-        logger.exception(f"downloadMidi error: {e}")
+        logger.exception(f"downloadFinished error: {e}")
+
+def downloadAllResults():
+    """Download every entry of the current search that isn't in downloadFolder yet."""
+    global bulkDownloading
+    logger.info("downloadAllResults called")
+    try:
+        from ui.midiHub import MidiHubTab
+        if bulkDownloading or not filteredData:
+            return
+
+        existing = set(os.listdir(downloadFolder))
+        jobs, seen = [], set()
+        for midi in filteredData:
+            midiFilename = midi.get("midiFilename")
+            # names come from the server: never let one leave downloadFolder
+            if not midiFilename or os.path.basename(midiFilename) != midiFilename or midiFilename in (".", ".."):
+                if midiFilename:
+                    logger.warning(f"skipping hub entry with unsafe filename {midiFilename!r}")
+                continue
+            if midiFilename in existing or midiFilename in seen:
+                continue
+            seen.add(midiFilename)
+            jobs.append((f"{httpClient.API_BASE}/api/midis/" + midiFilename, os.path.join(downloadFolder, midiFilename)))
+
+        if not jobs:
+            mainFunctions.log("All results are already downloaded.")
+            return
+
+        limit = int(configuration.configData["midiPlayer"].get("hubDownloadConcurrency", 4))
+        mainFunctions.log(f"Downloading {len(jobs)} MIDI files...")
+        bulkDownloading = True
+
+        counter = {"done": 0}
+        counterLock = threading.Lock()
+
+        def onDone(future):
+            with counterLock:
+                counter["done"] += 1
+                done = counter["done"]
+            if done % 10 == 0 and done < len(jobs):
+                mainFunctions.log(f"Downloaded {done}/{len(jobs)}")
+
+        futures = downloadManager.manager.downloadAll(jobs, limit, onDone=onDone)
+
+        def waitAll():
+            concurrent.futures.wait(futures)
+            saved = [f.result() for f in futures if f.exception() is None]
+            MidiHubTab.mainScrollFrame.after(0, bulkDownloadFinished, saved, len(futures) - len(saved))
+
+        threading.Thread(target=waitAll, daemon=True).start()
+    except Exception as e:
+        bulkDownloading = False
+        logger.exception(f"downloadAllResults error: {e}")
+
+def bulkDownloadFinished(saved, failed):
+    """Add a finished batch to midiList with a single config save; runs on the Tk thread."""
+    global bulkDownloading
+    bulkDownloading = False
+    try:
+        from ui.midiPlayer import MidiPlayerTab
+        midiList = list(configuration.configData['midiPlayer'].get('midiList', []))
+        added = [path for path in saved if path not in midiList]
+        if added:
+            configuration.configData['midiPlayer']['midiList'] = midiList + added
+
+            currentValues = list(MidiPlayerTab.filePathEntry.cget("values"))
+            MidiPlayerTab.filePathEntry.configure(values=currentValues + [p for p in added if p not in currentValues])
+
+        library.startScan(saved, folders=())
+        mainFunctions.log(f"Bulk download finished: {len(saved)} saved, {failed} failed.")
+        logger.debug(f"bulk download: {len(saved)} saved, {failed} failed")
+    except Exception as e:
+        logger.exception(f"bulkDownloadFinished error: {e}")
 
 def midiHubFooter():
+    global footerFrame, footerLabel
     logger.debug("midiHubFooter called")
     try:
         from ui.midiHub import MidiHubTab
-        paginationFrame = ctk.CTkFrame(master=MidiHubTab.mainScrollFrame, fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PageControlFrameBackground"])
-        paginationFrame.grid(row=pageSize + 1, column=0, padx=20, pady=5, sticky="nsew")
-        ctk.CTkButton(master=paginationFrame, text="Previous", width=118, font=customTheme.globalFont14,
-            command=prevPage, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PreviousButtonColor"],
-            hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PreviousButtonHoverColor"]).grid(row=0, column=0, padx=9, pady=10)
-        ctk.CTkLabel(master=paginationFrame, text=f"Page {currentPage}/{totalPages}", font=customTheme.globalFont14,
-            text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"]).grid(row=0, column=1, padx=(13, 0), pady=10)
-        ctk.CTkButton(master=paginationFrame, text="Next", font=customTheme.globalFont14, width=118,
-            command=nextPage, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["NextButtonColor"],
-            hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["NextButtonHoverColor"]).grid(row=0, column=2, padx=18, pady=10)
+        if footerFrame is None or not footerFrame.winfo_exists():
+            footerFrame = ctk.CTkFrame(master=MidiHubTab.mainScrollFrame, fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PageControlFrameBackground"])
+            ctk.CTkButton(master=footerFrame, text="Previous", width=118, font=customTheme.globalFont14,
+                command=prevPage, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
+                fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PreviousButtonColor"],
+                hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["PreviousButtonHoverColor"]).grid(row=0, column=0, padx=9, pady=10)
+            footerLabel = ctk.CTkLabel(master=footerFrame, text="", font=customTheme.globalFont14,
+                text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"])
+            footerLabel.grid(row=0, column=1, padx=(13, 0), pady=10)
+            ctk.CTkButton(master=footerFrame, text="Next", font=customTheme.globalFont14, width=118,
+                command=nextPage, text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
+                fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["NextButtonColor"],
+                hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["NextButtonHoverColor"]).grid(row=0, column=2, padx=18, pady=10)
+        footerLabel.configure(text=f"Page {currentPage}/{totalPages}")
+        footerFrame.grid(row=pageSize + 1, column=0, padx=20, pady=5, sticky="nsew")
     except Exception as e:
         logger.exception(f"midiHubFooter error: {e}")
 
@@ -305,46 +466,44 @@ def nextPage():
         logger.exception(f"nextPage error: {e}")
 
 def filteredMidiData():
-    global totalPages, filteredData, currentPage
+    global currentPage, lastQuery, searchAfterId
     logger.info("filteredMidiData called")
     try:
         from ui.midiHub import MidiHubTab
-        for widget in MidiHubTab.mainScrollFrame.winfo_children():
-            if widget not in (MidiHubTab.searchEntry, MidiHubTab.searchButton, MidiHubTab.sortComboBox):
-                widget.destroy()
+        searchAfterId = None
+        if catalogIndex is None:
+            return
 
-        pleaseWait = ctk.CTkLabel(
-            MidiHubTab.mainScrollFrame, text="Please Wait...", text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            compound="left", font=customTheme.globalFont40
-        )
-        pleaseWait.grid(row=1, column=0, padx=10, pady=(150,0), sticky="nsew")
-        pleaseWait2 = ctk.CTkLabel(
-            MidiHubTab.mainScrollFrame, text="Fetching from nanomidi.net...", text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
-            compound="left", font=customTheme.globalFont14
-        )
-        pleaseWait2.grid(row=2, column=0, padx=10, pady=(100,0), sticky="nsew")
-        MidiHubTab.mainScrollFrame.update()
+        searchQuery = MidiHubTab.searchEntry.get()
+        if searchQuery == lastQuery:
+            return
+        lastQuery = searchQuery
 
-        searchQuery = MidiHubTab.searchEntry.get().lower()
         logger.debug(f"searchQuery: {searchQuery}")
-        filteredData = [
-            midi for midi in allMidiData
-            if searchQuery in midi["name"].lower() or searchQuery in midi["artists"].lower()
-        ]
-        totalPages = (len(filteredData) + pageSize - 1) // pageSize
+        applySearch(searchQuery)
         currentPage = 1
         showPage(currentPage)
     except Exception as e:
         logger.exception(f"filteredMidiData error: {e}")
 
+def removeTransientWidgets():
+    """Destroy loading/error widgets; the pooled cards and the footer are only hidden."""
+    from ui.midiHub import MidiHubTab
+    keep = {MidiHubTab.searchEntry, MidiHubTab.searchButton, MidiHubTab.sortComboBox, MidiHubTab.downloadAllButton, footerFrame, *cardPool}
+    for widget in MidiHubTab.mainScrollFrame.winfo_children():
+        if widget not in keep:
+            widget.destroy()
+
 def clearList():
     logger.debug("clearList called")
     try:
         from ui.midiHub import MidiHubTab
         MidiHubTab.mainScrollFrame._parent_canvas.yview_moveto(0)
-        for widget in MidiHubTab.mainScrollFrame.winfo_children():
-            if widget not in (MidiHubTab.searchEntry, MidiHubTab.searchButton, MidiHubTab.sortComboBox):
-                widget.destroy()
+        removeTransientWidgets()
+        for card in cardPool:
+            card.grid_remove()
+        if footerFrame is not None:
+            footerFrame.grid_remove()
         loadingFrame = ctk.CTkFrame(MidiHubTab.mainScrollFrame, fg_color="transparent")
         loadingFrame.grid(row=1, column=0, padx=10, pady=(150,0), sticky="nsew")
         pleaseWaitText = ctk.CTkLabel(
@@ -6,10 +6,12 @@ import logging
 
 import customtkinter
 from tkinter import filedialog
-from mido import MidiFile
 
 from modules import configuration
+from modules import library
+from modules.midiHandler import playability
 from modules.playback_state import playback_state
+from modules.playbackWorker import worker
 from modules.functions import mainFunctions
 from modules.midiHandler import useOutput
 
@@ -29,6 +31,10 @@ elif osName == "Linux":
 
 app = mainFunctions.getApp()
 
+# playback worker events arrive on its listener thread
+worker.onLog = mainFunctions.log
+worker.onFinished = lambda: MidiPlayerTab.playButton.after(0, stopPlayback)
+
 # ------------------------
 # UI STATE VARS
 # ------------------------
@@ -52,21 +58,8 @@ def setSpeed(value):
     logger.info(f"setSpeed called with speed: {value}")
 
     try:
-        percent = max(1, min(500, float(value)))
-        playback_state.speed = percent
-
-        realSpeed = percent / 100.0
-
-        if configuration.configData["midiPlayer"]["useMIDIOutput"]:
-            useOutput.playbackSpeed = realSpeed
-        else:
-            midiHandler.playbackSpeed = realSpeed
-
-        # update UI safely
-        MidiPlayerTab.speedSlider.set(percent)
-        MidiPlayerTab.speedValueEntry.delete(0, "end")
-        MidiPlayerTab.speedValueEntry.insert(0, str(int(percent)))
-
+        applySpeed(value)
+        showSpeed()
     except Exception as e:
         logger.exception(f"setSpeed error: {e}")
 
@@ -149,6 +142,7 @@ def selectFile():
 
         if not filePath:
             return
+        filePath = os.path.abspath(filePath)    # same form as the library index
 
         currentVAL = list(MidiPlayerTab.filePathEntry.cget("values"))
         if filePath not in currentVAL:
@@ -156,15 +150,7 @@ def selectFile():
             MidiPlayerTab.filePathEntry.configure(values=currentVAL)
 
         MidiPlayerTab.filePathEntry.set(filePath)
-        midiFile = MidiFile(filePath, clip=True)
-
-        total = midiFile.length
-        timelineText = (
-            f"0:00:00 / {str(datetime.timedelta(seconds=int(total)))}"
-            if configuration.configData["appUI"]["timestamp"]
-            else f"X:XX:XX / {str(datetime.timedelta(seconds=int(total)))}"
-        )
-        MidiPlayerTab.timelineIndicator.configure(text=timelineText)
+        showDuration(filePath)
 
         configuration.configData["midiPlayer"]["currentFile"] = filePath
         configuration.configData["midiPlayer"].setdefault("midiList", [])
@@ -172,6 +158,7 @@ def selectFile():
             configuration.configData["midiPlayer"]["midiList"].append(filePath)
         configuration.configData.save()
 
+        reportPlayability(filePath)
         bindControls()
     except Exception as e:
         logger.exception(f"selectFile error: {e}")
@@ -183,18 +170,21 @@ def loadSavedFile():
         midiList = configuration.configData["midiPlayer"].get("midiList", [])
         currentFile = configuration.configData["midiPlayer"].get("currentFile", "")
 
-        midiList = [f for f in midiList if os.path.exists(f)]
+        # absolute, like the library index, so saved and indexed paths compare equal
+        midiList = list(dict.fromkeys(os.path.abspath(f) for f in midiList if os.path.exists(f)))
         configuration.configData["midiPlayer"]["midiList"] = midiList
 
         if currentFile and not os.path.exists(currentFile):
             currentFile = ""
-            configuration.configData["midiPlayer"]["currentFile"] = ""
+        elif currentFile:
+            currentFile = os.path.abspath(currentFile)
+        configuration.configData["midiPlayer"]["currentFile"] = currentFile
 
         configuration.configData.save()
 
         entryValues = list(MidiPlayerTab.filePathEntry.cget("values"))
 
-        downloadFolder = os.path.join(configuration.baseDirectory, "Midis")
+        downloadFolder = os.path.abspath(os.path.join(configuration.baseDirectory, "Midis"))
         if os.path.exists(downloadFolder):
             for filename in os.listdir(downloadFolder):
                 if filename.lower().endswith((".mid", ".midi")):
@@ -208,6 +198,10 @@ def loadSavedFile():
 
         MidiPlayerTab.filePathEntry.configure(values=entryValues)
 
+        # index the downloads folder and saved files in the background,
+        # then list what the index found
+        library.startScan(midiList, onDone=lambda analyzed, removed: MidiPlayerTab.filePathEntry.after(0, refreshFileList))
+
         chosen = None
         if currentFile:
             chosen = currentFile
@@ -223,14 +217,7 @@ def loadSavedFile():
             configuration.configData["midiPlayer"]["currentFile"] = chosen
             configuration.configData.save()
 
-            midiFileData = MidiFile(chosen, clip=True)
-            total = midiFileData.length
-            timelineText = (
-                f"0:00:00 / {str(datetime.timedelta(seconds=int(total)))}"
-                if configuration.configData["appUI"]["timestamp"]
-                else f"X:XX:XX / {str(datetime.timedelta(seconds=int(total)))}"
-            )
-            MidiPlayerTab.timelineIndicator.configure(text=timelineText)
+            showDuration(chosen)
             logger.debug(f"loaded file: {chosen}")
             return
 
@@ -241,6 +228,56 @@ def loadSavedFile():
         logger.exception(f"loadSavedFile error: {e}")
 
 
+def refreshFileList():
+    """Dropdown values from the library index: readable files in the downloads folder and the saved list."""
+    try:
+        midiList = [os.path.abspath(p) for p in configuration.configData["midiPlayer"].get("midiList", [])]
+        saved = set(midiList)
+        downloads = os.path.join(os.path.abspath(library.midiFolder), "")
+        values = [row["path"] for row in library.entries() if row["path"].startswith(downloads) or row["path"] in saved]
+        known = set(values)
+        for p in midiList:
+            if p not in known and os.path.exists(p):
+                values.append(p)
+        MidiPlayerTab.filePathEntry.configure(values=values)
+    except Exception as e:
+        logger.debug(f"refreshFileList warning: {e}")
+
+
+def timelineLength(total) -> str:
+    """Timeline text before playback; the length reads -:--:-- while it is unknown."""
+    length = str(datetime.timedelta(seconds=int(total))) if total is not None else "-:--:--"
+    start = "0:00:00" if configuration.configData["appUI"]["timestamp"] else "X:XX:XX"
+    return f"{start} / {length}"
+
+
+def showDuration(midiFile):
+    """
+    Put midiFile's length on the timeline. Indexed files answer from
+    SQLite; anything else is parsed on a worker thread, not on Tk.
+    """
+    total = library.cachedDuration(midiFile)
+    MidiPlayerTab.timelineIndicator.configure(text=timelineLength(total))
+    if total is not None:
+        return
+
+    def run():
+        try:
+            total = library.duration(midiFile)
+        except Exception as e:
+            logger.debug(f"duration failed for {midiFile}: {e}")
+            total = 0.0
+
+        def show():
+            # the user may have picked another file (or started it) meanwhile
+            if MidiPlayerTab.filePathEntry.get() == midiFile and not playback_state.running:
+                MidiPlayerTab.timelineIndicator.configure(text=timelineLength(total))
+
+        MidiPlayerTab.timelineIndicator.after(0, show)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
 def switchMidiEvent(event=None):
     logger.info("switchMidiEvent called")
     try:
@@ -248,20 +285,26 @@ def switchMidiEvent(event=None):
         configuration.configData["midiPlayer"]["currentFile"] = midiFile
         configuration.configData.save()
 
-        midiFileData = MidiFile(midiFile, clip=True)
-        total = midiFileData.length
-        timelineText = (
-            f"0:00:00 / {str(datetime.timedelta(seconds=int(total)))}"
-            if configuration.configData["appUI"]["timestamp"]
-            else f"X:XX:XX / {str(datetime.timedelta(seconds=int(total)))}"
-        )
-        MidiPlayerTab.timelineIndicator.configure(text=timelineText)
+        showDuration(midiFile)
+        reportPlayability(midiFile)
         bindControls()
         logger.debug(f"switched midi file to: {midiFile}")
     except Exception as e:
         logger.exception(f"switchMidiEvent error: {e}")
 
 
+def reportPlayability(midiFile):
+    """Log how well the selected file suits the key mapping; cached in the library index."""
+    def run():
+        try:
+            result = library.playabilityFor(midiFile)
+            mainFunctions.log(f"Playability: {playability.summary(result)}")
+        except Exception as e:
+            logger.debug(f"playability failed for {midiFile}: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
 # ------------------------
 # HOTKEYS (NO-OP ON WAYLAND BUILD)
 # ------------------------
@@ -314,6 +357,7 @@ def startPlayback():
         # mark running
         playback_state.running = True
         playback_state.paused = False
+        playback_state.use_worker = configuration.configData["midiPlayer"].get("workerProcess", False)
 
         MidiPlayerTab.playButton.configure(
             text="Playing",
@@ -345,8 +389,15 @@ def startPlayback():
                 playback_state.running = False
                 return
 
-            useOutput.startPlayback(midiFile, outputDevice, updateCallback=updateTimeline)
-            logger.debug("useOutput.startPlayback called")
+            if playback_state.use_worker:
+                worker.play(midiFile, outputDevice, realSpeed, updateCallback=updateTimeline)
+                logger.debug("worker.play called (MIDI out)")
+            else:
+                useOutput.startPlayback(midiFile, outputDevice, updateCallback=updateTimeline)
+                logger.debug("useOutput.startPlayback called")
+        elif playback_state.use_worker:
+            worker.play(midiFile, None, realSpeed, updateCallback=updateTimeline)
+            logger.debug("worker.play called")
         else:
             midiHandler.startPlayback(midiFile, updateCallback=updateTimeline)
             logger.debug("midiHandler.startPlayback called")
@@ -360,23 +411,14 @@ def stopPlayback():
     logger.info("stopPlayback called")
 
     # Prevent double-stop race conditions
-    if not playback_state.running:
+    if not applyStop():
         return
 
-    # --- STOP ENGINE FIRST ---
-    try:
-        if configuration.configData["midiPlayer"]["useMIDIOutput"]:
-            useOutput.stopPlayback()
-        else:
-            midiHandler.stopPlayback()
-    except Exception as e:
-        logger.debug(f"Playback engine stop raised (safe to ignore): {e}")
+    showStopped()
+    mainFunctions.log("Stopped.")
 
-    # --- HARD RESET STATE ---
-    playback_state.running = False
-    playback_state.paused = False
-    playback_state.sustain_active = False
 
+def showStopped():
     # --- UI RESET (VERY IMPORTANT ORDER) ---
     try:
         # Restore PLAY button
@@ -400,38 +442,22 @@ def stopPlayback():
         midiFile = MidiPlayerTab.filePathEntry.get()
 
         if midiFile and os.path.exists(midiFile):
-            midiFileData = MidiFile(midiFile, clip=True)
-            totalTime = midiFileData.length
-
-            timelineText = (
-                f"0:00:00 / {str(datetime.timedelta(seconds=int(totalTime)))}"
-                if configuration.configData["appUI"]["timestamp"]
-                else f"X:XX:XX / {str(datetime.timedelta(seconds=int(totalTime)))}"
-            )
-
-            MidiPlayerTab.timelineIndicator.configure(text=timelineText)
+            showDuration(midiFile)
 
     except Exception as e:
         logger.debug(f"Timeline reset warning: {e}")
 
-    mainFunctions.log("Stopped.")
-
 def pausePlayback():
     logger.info("pausePlayback called")
 
-    if not playback_state.running:
+    if applyPause() is None:
         return
 
-    playback_state.paused = not playback_state.paused
+    showPaused()
+    mainFunctions.log("Paused" if playback_state.paused else "Resumed")
 
-    try:
-        if configuration.configData["midiPlayer"]["useMIDIOutput"]:
-            useOutput.pausePlayback()
-        else:
-            midiHandler.pausePlayback()
-    except Exception:
-        pass
 
+def showPaused():
     try:
         if playback_state.paused:
             MidiPlayerTab.playButton.configure(
@@ -448,14 +474,137 @@ def pausePlayback():
     except Exception:
         pass
 
-    mainFunctions.log("Paused" if playback_state.paused else "Resumed")
-
 def changeSpeed(amount):
     logger.info("changeSpeed called")
     try:
-        if configuration.configData["midiPlayer"]["useMIDIOutput"]:
+        if playback_state.use_worker:
+            mainFunctions.log(f"Speed: {worker.changeSpeed(amount) * 100:.0f}%")
+        elif configuration.configData["midiPlayer"]["useMIDIOutput"]:
             useOutput.changeSpeed(amount)
         else:
             midiHandler.changeSpeed(amount)
     except Exception:
         pass
+
+
+def decreaseSpeed():
+    setSpeed(playback_state.speed - configuration.configData["midiPlayer"]["decreaseSize"])
+
+
+def increaseSpeed():
+    setSpeed(playback_state.speed + configuration.configData["midiPlayer"]["decreaseSize"])
+
+
+# ------------------------
+# TRANSPORT (any thread)
+# ------------------------
+# The apply* functions only touch playback_state and the engine, whose
+# controls (gate, speed globals, the worker's control block) are thread
+# safe, so IPC can call them without waiting for the Tk thread and sync
+# the widgets afterwards with syncTransportUI.
+transportLock = threading.Lock()
+
+
+def applySpeed(value) -> float:
+    """Set the engine speed (percent, clamped to 1..500) and return it."""
+    percent = max(1, min(500, float(value)))
+    with transportLock:
+        playback_state.speed = percent
+        realSpeed = percent / 100.0
+
+        if playback_state.use_worker:
+            worker.setSpeed(realSpeed)
+        elif configuration.configData["midiPlayer"]["useMIDIOutput"]:
+            useOutput.playbackSpeed = realSpeed
+        else:
+            midiHandler.playbackSpeed = realSpeed
+    return percent
+
+
+def applyPause():
+    """Toggle pause on the engine. Returns the new paused state, or None when nothing plays."""
+    with transportLock:
+        if not playback_state.running:
+            return None
+        playback_state.paused = not playback_state.paused
+
+        try:
+            if playback_state.use_worker:
+                worker.pause(playback_state.paused)
+            elif configuration.configData["midiPlayer"]["useMIDIOutput"]:
+                useOutput.pausePlayback()
+            else:
+                midiHandler.pausePlayback()
+        except Exception:
+            pass
+        return playback_state.paused
+
+
+def applyStop() -> bool:
+    """Stop the engine and reset playback_state. False when nothing was playing."""
+    with transportLock:
+        if not playback_state.running:
+            return False
+        useWorker = playback_state.use_worker
+
+        # reset first: the play thread calls stopPlayback() on its way
+        # out, and has to see there is nothing left to stop
+        playback_state.running = False
+        playback_state.paused = False
+        playback_state.sustain_active = False
+
+    # --- STOP ENGINE (joins the play thread, so outside the lock) ---
+    try:
+        if useWorker:
+            worker.stop()
+        elif configuration.configData["midiPlayer"]["useMIDIOutput"]:
+            useOutput.stopPlayback()
+        else:
+            midiHandler.stopPlayback()
+    except Exception as e:
+        logger.debug(f"Playback engine stop raised (safe to ignore): {e}")
+    return True
+
+
+def showSpeed():
+    MidiPlayerTab.speedSlider.set(playback_state.speed)
+    MidiPlayerTab.speedValueEntry.delete(0, "end")
+    MidiPlayerTab.speedValueEntry.insert(0, str(int(playback_state.speed)))
+
+
+def syncTransportUI():
+    """Tk thread: redraw the transport widgets after an apply* from elsewhere."""
+    try:
+        showSpeed()
+    except Exception as e:
+        logger.debug(f"speed UI sync warning: {e}")
+    if not playback_state.running:
+        showStopped()
+    else:
+        showPaused()
+
+
+# ------------------------
+# STATUS (IPC queries)
+# ------------------------
+def playbackStatus():
+    """Snapshot of the player; only reads state, so it is safe off the Tk thread."""
+    if not playback_state.running:
+        state = "stopped"
+    else:
+        state = "paused" if playback_state.paused else "playing"
+
+    if playback_state.use_worker:
+        position = worker.position
+    elif configuration.configData["midiPlayer"]["useMIDIOutput"]:
+        position = useOutput.songPosition
+    else:
+        position = midiHandler.songPosition
+
+    return {
+        "state": state,
+        "position": round(position, 3) if playback_state.running else 0.0,
+        "speed": playback_state.speed,
+        "file": configuration.configData["midiPlayer"].get("currentFile", ""),
+        "worker": playback_state.use_worker,
+    }
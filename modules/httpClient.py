@@ -0,0 +1,64 @@
+import threading
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+API_BASE = "https://api.nanomidi.net"
+
+# (connect, read) seconds, used when a caller doesn't pass its own
+DEFAULT_TIMEOUT = (5, 15)
+POOL_SIZE = 16        # a hub page fetches 10 thumbnails at once
+RETRIES = 3
+BACKOFF = 0.5         # 0.5s, 1s, 2s between attempts
+
+_session = None
+_sessionLock = threading.Lock()
+
+
+def _buildSession() -> requests.Session:
+    retry = Retry(
+        total=RETRIES,
+        connect=RETRIES,
+        read=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "nanoMIDIPlayer"
+    return session
+
+
+def getSession() -> requests.Session:
+    """The shared keep-alive session, created on first use."""
+    global _session
+    if _session is None:
+        with _sessionLock:
+            if _session is None:
+                _session = _buildSession()
+                logger.debug("HTTP session created")
+    return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """session.get() with DEFAULT_TIMEOUT unless the caller sets one."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return getSession().get(url, **kwargs)
+
+
+def close():
+    global _session
+    with _sessionLock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,222 @@
+import io
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from modules import configuration
+from modules import httpClient
+
+logger = logging.getLogger(__name__)
+
+cacheDirectory = os.path.join(configuration.baseDirectory, "cache", "hub")
+
+# ============================================================
+# CATALOG CACHE
+# ============================================================
+# /api/midiData is the whole hub catalog. It is kept:
+#   - in memory for the rest of the session (tab switches are free)
+#   - on disk as the raw response body + its validators, so the hub
+#     renders straight from it on the next launch
+# and revalidated in the background with If-None-Match /
+# If-Modified-Since, which costs a 304 when nothing changed.
+
+catalogUrl = f"{httpClient.API_BASE}/api/midiData"
+catalogPath = os.path.join(cacheDirectory, "catalog.json")
+catalogMetaPath = os.path.join(cacheDirectory, "catalog.meta.json")
+REVALIDATE_INTERVAL = 60  # seconds between background checks
+
+_catalog = None
+_catalogMeta = {}
+_lastRevalidated = 0.0
+_catalogLock = threading.Lock()
+
+
+def _writeAtomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"  # thumbnails can be written from several threads
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def cachedCatalog():
+    """The catalog from memory or disk, or None if it was never fetched."""
+    global _catalog, _catalogMeta
+    with _catalogLock:
+        if _catalog is not None:
+            return _catalog
+        try:
+            with open(catalogPath, "rb") as f:
+                catalog = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"discarding unreadable catalog cache: {e}")
+            return None
+
+        # without validators the catalog is still usable; the next
+        # revalidation just can't be conditional
+        try:
+            with open(catalogMetaPath, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"ignoring unreadable catalog validators: {e}")
+            meta = {}
+
+        _catalog, _catalogMeta = catalog, meta if isinstance(meta, dict) else {}
+        logger.debug(f"catalog loaded from disk ({len(_catalog)} entries)")
+        return _catalog
+
+
+def needsRevalidation() -> bool:
+    return time.monotonic() - _lastRevalidated >= REVALIDATE_INTERVAL
+
+
+def fetchCatalog():
+    """
+    Revalidate against the server.
+
+    Returns (catalog, changed). Raises requests exceptions when the
+    server can't be reached, so callers can fall back to the cache.
+    """
+    global _catalog, _catalogMeta, _lastRevalidated
+    cachedCatalog()
+
+    headers = {}
+    if _catalog is not None:
+        if _catalogMeta.get("etag"):
+            headers["If-None-Match"] = _catalogMeta["etag"]
+        if _catalogMeta.get("lastModified"):
+            headers["If-Modified-Since"] = _catalogMeta["lastModified"]
+
+    response = httpClient.get(catalogUrl, headers=headers)
+    _lastRevalidated = time.monotonic()
+
+    if response.status_code == 304 and _catalog is not None:
+        logger.debug("catalog not modified")
+        return _catalog, False
+
+    response.raise_for_status()
+    data = response.json()
+    meta = {
+        "etag": response.headers.get("ETag"),
+        "lastModified": response.headers.get("Last-Modified"),
+        "fetchedAt": time.time(),
+    }
+
+    with _catalogLock:
+        changed = data != _catalog
+        _catalog, _catalogMeta = data, meta
+
+    try:
+        _writeAtomic(catalogPath, response.content)
+        _writeAtomic(catalogMetaPath, json.dumps(meta).encode("utf-8"))
+    except OSError as e:
+        logger.warning(f"could not write catalog cache: {e}")
+
+    logger.debug(f"catalog fetched ({len(data)} entries, changed={changed})")
+    return data, changed
+
+
+# ============================================================
+# THUMBNAIL CACHE
+# ============================================================
+# Two levels, both keyed by the catalog's imageFilename:
+#   - memory: LRU of decoded CTkImages, so paging back costs nothing
+#   - disk:   the downloaded bytes under cache/hub/thumbnails, so a
+#             new session only decodes
+# Thumbnails are immutable per filename, so disk entries never need
+# revalidation; the folder is trimmed to THUMBNAIL_DISK_LIMIT files.
+
+thumbnailDirectory = os.path.join(cacheDirectory, "thumbnails")
+THUMBNAIL_SIZE = (100, 100)
+THUMBNAIL_MEMORY_LIMIT = 120       # about 12 pages of cards
+THUMBNAIL_DISK_LIMIT = 3000
+
+_thumbnails = OrderedDict()
+_thumbnailLock = threading.Lock()
+_diskTrimmed = False
+_unsafeChars = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def thumbnailUrl(imageFilename: str) -> str:
+    return f"{httpClient.API_BASE}/api/v2/images/{imageFilename}?size={THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}"
+
+
+def _thumbnailPath(imageFilename: str) -> str:
+    return os.path.join(thumbnailDirectory, _unsafeChars.sub("_", imageFilename))
+
+
+def cachedThumbnail(imageFilename: str):
+    """Decoded thumbnail if it is in memory, else None. Never blocks on I/O."""
+    with _thumbnailLock:
+        image = _thumbnails.get(imageFilename)
+        if image is not None:
+            _thumbnails.move_to_end(imageFilename)
+        return image
+
+
+def _remember(imageFilename: str, image):
+    with _thumbnailLock:
+        _thumbnails[imageFilename] = image
+        _thumbnails.move_to_end(imageFilename)
+        while len(_thumbnails) > THUMBNAIL_MEMORY_LIMIT:
+            _thumbnails.popitem(last=False)
+
+
+def _trimDisk():
+    global _diskTrimmed
+    _diskTrimmed = True
+    try:
+        entries = [e for e in os.scandir(thumbnailDirectory) if e.is_file()]
+    except FileNotFoundError:
+        return
+    if len(entries) <= THUMBNAIL_DISK_LIMIT:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - THUMBNAIL_DISK_LIMIT]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def thumbnail(imageFilename: str):
+    """
+    CTkImage for a catalog thumbnail: memory, then disk, then network.
+
+    Raises requests / PIL exceptions when it can't be fetched or decoded.
+    """
+    import customtkinter as ctk
+    from PIL import Image
+
+    image = cachedThumbnail(imageFilename)
+    if image is not None:
+        return image
+
+    path = _thumbnailPath(imageFilename)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        response = httpClient.get(thumbnailUrl(imageFilename))
+        response.raise_for_status()
+        data = response.content
+        try:
+            _writeAtomic(path, data)
+        except OSError as e:
+            logger.debug(f"could not cache thumbnail {imageFilename}: {e}")
+        if not _diskTrimmed:
+            _trimDisk()
+
+    pil = Image.open(io.BytesIO(data))
+    pil.load()
+    image = ctk.CTkImage(pil, size=THUMBNAIL_SIZE)
+    _remember(imageFilename, image)
+    return image
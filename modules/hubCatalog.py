@@ -0,0 +1,215 @@
+import re
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# CATALOG SEARCH INDEX
+# ============================================================
+# Built once per catalog load so a query never scans the entries:
+#   postings   token → {entry position: best field weight}
+#   vocabulary sorted tokens, for prefix ranges with bisect
+#   trigrams   trigram → tokens, to find fuzzy candidates
+#
+# A query matches an entry when every query word matches one of its
+# tokens exactly, as a prefix, or within a small edit distance. The
+# match strength times the field weight is summed per entry to rank.
+#
+# Typing re-runs the search on every key, and most keystrokes only
+# extend the last word, so each word's scores and each query's result
+# are cached on the index; "night lo" reuses "night" from the query
+# before it.
+
+# sort orders offered by the hub's combo box: (key, newest/biggest first)
+SORT_KEYS = {
+    "Newest": (lambda m: m.get("id", 0), True),
+    "Oldest": (lambda m: m.get("id", 0), False),
+    "Downloads": (lambda m: m.get("downloads", 0) or 0, True),
+    "Views": (lambda m: m.get("views", 0) or 0, True),
+}
+
+FIELD_WEIGHTS = (("name", 4.0), ("artists", 3.0), ("arranger", 1.5), ("uploader", 1.0))
+EXACT, PREFIX, FUZZY = 1.0, 0.6, 0.3
+MIN_FUZZY = 4           # shorter words are too ambiguous to correct
+WORD_CACHE = 256        # per-word score maps kept between keystrokes
+RESULT_CACHE = 64       # (query, order) results kept
+
+_tokenPattern = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text) -> list:
+    return _tokenPattern.findall(str(text or "").lower())
+
+
+def _trigrams(token: str):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _withinDistance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, giving up as soon as a row exceeds it."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class CatalogIndex:
+    """Search index over the hub catalog. entries keeps the order it was given."""
+
+    def __init__(self, entries: list):
+        self.entries = entries
+        self.postings = {}
+        self.trigrams = {}
+        self._wordScores = {}
+        self._results = {}
+
+        for position, midi in enumerate(entries):
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(midi.get(field)):
+                    bucket = self.postings.setdefault(token, {})
+                    if bucket.get(position, 0.0) < weight:
+                        bucket[position] = weight
+
+        self.vocabulary = sorted(self.postings)
+        for token in self.vocabulary:
+            if len(token) >= MIN_FUZZY - 1:
+                for gram in _trigrams(token):
+                    self.trigrams.setdefault(gram, []).append(token)
+
+        # each sort order as a permutation of entry positions, plus its
+        # inverse (position → rank) to order search hits without re-sorting
+        self.orders = {}
+        self.ranks = {}
+        for name, (key, descending) in SORT_KEYS.items():
+            order = sorted(range(len(entries)), key=lambda p: key(entries[p]), reverse=descending)
+            rank = [0] * len(entries)
+            for r, position in enumerate(order):
+                rank[position] = r
+            self.orders[name] = order
+            self.ranks[name] = rank
+
+        logger.debug(f"catalog index: {len(entries)} entries, {len(self.vocabulary)} tokens")
+
+    # --- term expansion ---
+    def _prefixMatches(self, word: str):
+        start = bisect.bisect_left(self.vocabulary, word)
+        end = bisect.bisect_left(self.vocabulary, word + "\uffff", start)
+        return self.vocabulary[start:end]
+
+    def _fuzzyMatches(self, word: str):
+        limit = 1 if len(word) < 8 else 2
+        grams = _trigrams(word)
+        counts = {}
+        for gram in grams:
+            for token in self.trigrams.get(gram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        # a distance of d can destroy at most 3*d trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        return [t for t, shared in counts.items() if shared >= needed and _withinDistance(word, t, limit)]
+
+    def _scoreWord(self, word: str) -> dict:
+        """entry position → best score for one query word (cached)."""
+        scores = self._wordScores.get(word)
+        if scores is not None:
+            return scores
+        scores = {}
+
+        def add(token, strength):
+            for position, weight in self.postings.get(token, {}).items():
+                score = weight * strength
+                if scores.get(position, 0.0) < score:
+                    scores[position] = score
+
+        add(word, EXACT)
+        for token in self._prefixMatches(word):
+            if token != word:
+                add(token, PREFIX)
+        if len(word) >= MIN_FUZZY:
+            for token in self._fuzzyMatches(word):
+                if token != word and not token.startswith(word):
+                    add(token, FUZZY)
+
+        if len(self._wordScores) >= WORD_CACHE:
+            self._wordScores.clear()
+        self._wordScores[word] = scores
+        return scores
+
+    # --- queries ---
+    def search(self, query: str, order=None) -> list:
+        """
+        Entry positions matching every word of query, best first; ties
+        follow the sort order (or catalog order). None when the query
+        has no words.
+        """
+        words = tokenize(query)
+        if not words:
+            return None
+
+        key = (tuple(sorted(set(words))), order)
+        positions = self._results.get(key)
+        if positions is not None:
+            return positions
+
+        total = None
+        # rarest-looking (longest) word first keeps the intersection small
+        for word in sorted(set(words), key=len, reverse=True):
+            scores = self._scoreWord(word)
+            if total is None:
+                total = scores
+            else:
+                total = {p: s + scores[p] for p, s in total.items() if p in scores}
+            if not total:
+                break
+
+        # tie order first, then a stable sort on score alone (reverse=True
+        # keeps ties in place); both keys are C lookups, not lambdas
+        rank = self.ranks.get(order)
+        total = total or {}
+        positions = sorted(total) if rank is None else sorted(total, key=rank.__getitem__)
+        positions.sort(key=total.__getitem__, reverse=True)
+
+        if len(self._results) >= RESULT_CACHE:
+            self._results.clear()
+        self._results[key] = positions
+        return positions
+
+    def view(self, query: str = "", order=None) -> "CatalogView":
+        """The entries to show for a search box value and sort order."""
+        positions = self.search(query, order)
+        if positions is None:
+            positions = self.orders.get(order)  # no query: the precomputed permutation as is
+        return CatalogView(self.entries, positions)
+
+
+class CatalogView:
+    """Read-only sequence of entries picked (and ordered) by positions; None = all, in order."""
+
+    __slots__ = ("entries", "positions")
+
+    def __init__(self, entries: list, positions=None):
+        self.entries = entries
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.entries if self.positions is None else self.positions)
+
+    def __getitem__(self, index):
+        if self.positions is None:
+            return self.entries[index]
+        if isinstance(index, slice):
+            return [self.entries[p] for p in self.positions[index]]
+        return self.entries[self.positions[index]]
+
+    def __iter__(self):
+        if self.positions is None:
+            return iter(self.entries)
+        return (self.entries[p] for p in self.positions)
@@ -0,0 +1,386 @@
+import os
+import sys
+import time
+import logging
+import sqlite3
+import argparse
+import threading
+import functools
+
+from modules import configuration
+from modules import midiAnalysis
+from modules.midiHandler import playability
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# LIBRARY INDEX
+# ============================================================
+# Metadata for every known MIDI file lives in library.db next to
+# config.json, so the player never parses a file just to show its
+# length, and thousands of files can be listed or filtered from one
+# query. A row is reused for as long as the file's (mtime, size) match;
+# the scanner only parses files that are new or changed since the last
+# scan and drops rows whose file is gone.
+
+databasePath = os.path.join(configuration.baseDirectory, "library.db")
+midiFolder = os.path.join(configuration.baseDirectory, "Midis")
+MIDI_EXTENSIONS = (".mid", ".midi")
+
+# each entry upgrades the schema by one version (PRAGMA user_version)
+MIGRATIONS = [
+    """
+    CREATE TABLE files (
+        path      TEXT PRIMARY KEY,
+        mtime     REAL NOT NULL,
+        size      INTEGER NOT NULL,
+        hash      TEXT,
+        duration  REAL,
+        tracks    INTEGER,
+        tempo     REAL,
+        lowNote   INTEGER,
+        highNote  INTEGER,
+        noteCount INTEGER,
+        error     TEXT,
+        scannedAt REAL NOT NULL
+    );
+    CREATE INDEX filesByHash ON files(hash);
+    """,
+    # bulk analysis features; mtime = -1 makes the next scan re-analyze old rows
+    """
+    ALTER TABLE files ADD COLUMN coverage61 REAL;
+    ALTER TABLE files ADD COLUMN coverage88 REAL;
+    ALTER TABLE files ADD COLUMN chordDensity REAL;
+    ALTER TABLE files ADD COLUMN hasDrums INTEGER;
+    UPDATE files SET mtime = -1;
+    """,
+    # playability per file and key mapping; signature covers pianoMap, 88Keys, noDoubles
+    """
+    CREATE TABLE playability (
+        path             TEXT NOT NULL,
+        signature        TEXT NOT NULL,
+        mtime            REAL NOT NULL,
+        size             INTEGER NOT NULL,
+        notes            INTEGER,
+        collisions       INTEGER,
+        noDoublesDrops   INTEGER,
+        unplayable       INTEGER,
+        modifierToggles  INTEGER,
+        togglesPerSecond REAL,
+        peakKeys         INTEGER,
+        cleanRatio       REAL,
+        PRIMARY KEY (path, signature)
+    );
+    """,
+]
+
+COLUMNS = ("path", "mtime", "size", "hash", "duration", "tracks", "tempo",
+           "lowNote", "highNote", "noteCount", "coverage61", "coverage88",
+           "chordDensity", "hasDrums", "error", "scannedAt")
+
+PLAYABILITY_COLUMNS = ("notes", "collisions", "noDoublesDrops", "unplayable", "modifierToggles",
+                       "togglesPerSecond", "peakKeys", "cleanRatio")
+
+_local = threading.local()
+_writeLock = threading.Lock()
+_scanLock = threading.Lock()
+
+
+def connect() -> sqlite3.Connection:
+    """This thread's connection, opened (and migrated) on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(databasePath), exist_ok=True)
+        conn = sqlite3.connect(databasePath, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn = conn
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection):
+    with _writeLock:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            with conn:
+                conn.executescript(script)
+                conn.execute(f"PRAGMA user_version={number}")
+            logger.debug(f"library schema migrated to version {number}")
+
+
+# ------------------------
+# STORAGE
+# ------------------------
+
+def store(rows):
+    conn = connect()
+    with _writeLock, conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO files ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            [tuple(row[c] for c in COLUMNS) for row in rows],
+        )
+
+
+def remove(paths):
+    conn = connect()
+    with _writeLock, conn:
+        conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+        conn.executemany("DELETE FROM playability WHERE path = ?", [(p,) for p in paths])
+
+
+# ------------------------
+# QUERIES
+# ------------------------
+
+def entry(path: str):
+    """The stored row for path (a dict), or None. May be stale; see refresh()."""
+    path = os.path.abspath(path)     # the index stores absolute paths
+    row = connect().execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def isCurrent(row, path: str) -> bool:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return row is not None and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size
+
+
+def refresh(path: str) -> dict:
+    """Up-to-date row for path, parsing the file only if it changed since it was indexed."""
+    path = os.path.abspath(path)
+    row = entry(path)
+    if not isCurrent(row, path):
+        row = midiAnalysis.analyzeFile(path)
+        store([row])
+    return row
+
+
+def duration(path: str) -> float:
+    """Song length in seconds from the index (0.0 when the file can't be read)."""
+    return refresh(path)["duration"] or 0.0
+
+
+def cachedDuration(path: str):
+    """Song length from the index without parsing; None when path isn't indexed or changed since."""
+    row = entry(path)
+    return (row["duration"] or 0.0) if isCurrent(row, path) else None
+
+
+def entries(text=None, maxDuration=None, lowNote=None, highNote=None, hasDrums=None, orderBy="path") -> list:
+    """
+    Indexed files as dicts, optionally filtered: text matches the path,
+    the note bounds keep files whose range fits inside them.
+    """
+    where, args = ["error IS NULL"], []
+    if text:
+        where.append("path LIKE ?")
+        args.append(f"%{text}%")
+    if maxDuration is not None:
+        where.append("duration <= ?")
+        args.append(maxDuration)
+    if lowNote is not None:
+        where.append("lowNote >= ?")
+        args.append(lowNote)
+    if highNote is not None:
+        where.append("highNote <= ?")
+        args.append(highNote)
+    if hasDrums is not None:
+        where.append("hasDrums = ?")
+        args.append(int(hasDrums))
+    if orderBy not in COLUMNS:
+        orderBy = "path"
+    query = f"SELECT * FROM files WHERE {' AND '.join(where)} ORDER BY {orderBy}"
+    return [dict(row) for row in connect().execute(query, args)]
+
+
+# ------------------------
+# PLAYABILITY
+# ------------------------
+
+def mappingSettings():
+    """(pianoMap, allow88, noDoubles) from the current config."""
+    settings = configuration.configData["midiPlayer"]
+    return settings["pianoMap"].to_dict(), bool(settings["88Keys"]), bool(settings["noDoubles"])
+
+
+def _signature(pianoMap, allow88: bool, noDoubles: bool) -> str:
+    return f"{playability.mapSignature(pianoMap, allow88)}:{int(noDoubles)}"
+
+
+def storePlayability(path: str, signature: str, result: dict, stat=None):
+    stat = stat or os.stat(path)
+    conn = connect()
+    with _writeLock, conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO playability (path, signature, mtime, size, {', '.join(PLAYABILITY_COLUMNS)}) "
+            f"VALUES (?, ?, ?, ?, {', '.join('?' * len(PLAYABILITY_COLUMNS))})",
+            (path, signature, stat.st_mtime, stat.st_size, *(result[c] for c in PLAYABILITY_COLUMNS)),
+        )
+
+
+def playabilityFor(path: str, settings=None) -> dict:
+    """
+    Playability of path under the given (or current) mapping settings,
+    computed only when the file or the mapping changed since last time.
+    """
+    pianoMap, allow88, noDoubles = settings or mappingSettings()
+    signature = _signature(pianoMap, allow88, noDoubles)
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    row = connect().execute(
+        "SELECT * FROM playability WHERE path = ? AND signature = ?", (path, signature)
+    ).fetchone()
+    if row is not None and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size:
+        return {c: row[c] for c in PLAYABILITY_COLUMNS}
+
+    result = playability.analyzeFile(path, pianoMap, allow88, noDoubles)
+    storePlayability(path, signature, result, stat)
+    return result
+
+
+def playableEntries(minClean: float = 0.95, maxTogglesPerSecond=None, settings=None) -> list:
+    """Indexed files whose cached playability under the mapping meets the limits, cleanest first."""
+    signature = _signature(*(settings or mappingSettings()))
+    where, args = ["p.signature = ?", "p.cleanRatio >= ?", "p.mtime = f.mtime", "p.size = f.size"], [signature, minClean]
+    if maxTogglesPerSecond is not None:
+        where.append("p.togglesPerSecond <= ?")
+        args.append(maxTogglesPerSecond)
+    query = (
+        f"SELECT f.*, {', '.join('p.' + c for c in PLAYABILITY_COLUMNS)} FROM files f "
+        f"JOIN playability p ON p.path = f.path WHERE {' AND '.join(where)} "
+        f"ORDER BY p.cleanRatio DESC, p.togglesPerSecond"
+    )
+    return [dict(row) for row in connect().execute(query, args)]
+
+
+def scanPlayability(processes=1) -> int:
+    """Fill in missing or stale playability for every readable indexed file. Returns how many were analyzed."""
+    settings = mappingSettings()
+    signature = _signature(*settings)
+    stale = [row["path"] for row in connect().execute(
+        "SELECT f.path FROM files f LEFT JOIN playability p ON p.path = f.path AND p.signature = ? "
+        "WHERE f.error IS NULL AND (p.path IS NULL OR p.mtime != f.mtime OR p.size != f.size)",
+        (signature,),
+    )]
+
+    pianoMap, allow88, noDoubles = settings
+    work = functools.partial(playability.analyzePath, pianoMap=pianoMap, allow88=allow88, noDoubles=noDoubles)
+    for path, result in midiAnalysis.poolMap(work, stale, processes):
+        if result is not None:
+            try:
+                storePlayability(path, signature, result)
+            except OSError:
+                pass
+    return len(stale)
+
+
+# ------------------------
+# SCANNER
+# ------------------------
+
+def _candidates(folders, paths) -> set:
+    found = {os.path.abspath(p) for p in paths if os.path.isfile(p)}
+    for folder in folders:
+        for root, _dirs, files in os.walk(folder):
+            for name in files:
+                if name.lower().endswith(MIDI_EXTENSIONS):
+                    found.add(os.path.join(root, name))
+    return found
+
+
+def scan(paths=(), folders=None, processes=1) -> tuple:
+    """
+    Bring the index up to date for the given folders (default: the
+    downloads folder) and extra files. Returns (analyzed, removed).
+
+    processes is passed to midiAnalysis.analyzeMany (None = all cores).
+    """
+    folders = [midiFolder] if folders is None else list(folders)
+    folders = [os.path.abspath(f) for f in folders if os.path.isdir(f)]
+
+    with _scanLock:
+        started = time.perf_counter()
+        found = _candidates(folders, paths)
+        known = {row["path"]: row for row in connect().execute("SELECT path, mtime, size FROM files")}
+
+        changed = [p for p in found if not isCurrent(known.get(p), p)]
+        rows = []
+        for row in midiAnalysis.analyzeMany(changed, processes):
+            rows.append(row)
+            if len(rows) >= 200:
+                store(rows)
+                rows = []
+        if rows:
+            store(rows)
+
+        # forget files that vanished from the scanned folders or were passed explicitly
+        scope = tuple(os.path.join(f, "") for f in folders)
+        explicit = {os.path.abspath(p) for p in paths}
+        gone = [p for p in known if p not in found and (p.startswith(scope) or p in explicit)]
+        if gone:
+            remove(gone)
+
+        logger.info(f"library scan: {len(found)} files, {len(changed)} analyzed, "
+                    f"{len(gone)} removed in {time.perf_counter() - started:.2f}s")
+        return len(changed), len(gone)
+
+
+def startScan(paths=(), folders=None, onDone=None) -> threading.Thread:
+    """
+    scan() on a daemon thread, in-process so the UI never forks. Large
+    imports go through the command line (python -m modules.library).
+    onDone(analyzed, removed) runs on the scan thread.
+    """
+    def run():
+        try:
+            result = scan(paths, folders)
+        except Exception as e:
+            logger.exception(f"library scan failed: {e}")
+            return
+        if onDone is not None:
+            onDone(*result)
+
+    thread = threading.Thread(target=run, name="libraryScan", daemon=True)
+    thread.start()
+    return thread
+
+
+# ------------------------
+# COMMAND LINE
+# ------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.library",
+        description="Analyze MIDI folders into the nanoMIDIPlayer library index.",
+    )
+    parser.add_argument("folders", nargs="*", help=f"folders to scan (default: {midiFolder})")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--playability", action="store_true", help="also score every file against the current key mapping")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    started = time.perf_counter()
+    analyzed, removed = scan(folders=args.folders or None, processes=args.processes)
+
+    rows = entries()
+    drums = sum(1 for row in rows if row["hasDrums"])
+    fits61 = sum(1 for row in rows if row["coverage61"] == 1.0)
+    print(f"{analyzed} analyzed, {removed} removed in {time.perf_counter() - started:.1f}s")
+    print(f"{len(rows)} playable files: {fits61} fit 61 keys, {drums} with drums")
+
+    if args.playability:
+        started = time.perf_counter()
+        scored = scanPlayability(args.processes)
+        clean = playableEntries()
+        print(f"{scored} scored in {time.perf_counter() - started:.1f}s; {len(clean)} play at least 95% clean")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
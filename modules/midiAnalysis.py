@@ -0,0 +1,149 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import contextlib
+import concurrent.futures
+
+import mido
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# MIDI FILE ANALYSIS
+# ============================================================
+# Feature extraction for the library index. Parsing with mido is pure
+# Python and CPU-bound, so analyzeMany() fans files out over a process
+# pool. This module only imports mido so pool targets load quickly, but
+# under spawn (Windows, macOS) every worker also re-imports the parent's
+# __main__, which may import modules.configuration; poolMap() starts the
+# workers with WORKER_ENV so that import stays offline and never saves.
+
+# inclusive MIDI note bounds each keyboard layout can play
+KEY_RANGES = {"61": (36, 96), "88": (21, 108)}
+DRUM_CHANNEL = 9          # channel 10, General MIDI percussion
+DEFAULT_TEMPO = 500000    # 120 BPM
+MIN_PARALLEL = 16         # fewer files than this are parsed in-process
+WORKER_ENV = {"NANOMIDI_OFFLINE": "1", "NANOMIDI_CONFIG_READONLY": "1"}
+
+
+def analyzeFile(path: str) -> dict:
+    """
+    Library row for one MIDI file. Files mido can't read still get a row,
+    with error set, so they aren't parsed again until they change.
+    """
+    stat = os.stat(path)
+    row = {
+        "path": path, "mtime": stat.st_mtime, "size": stat.st_size, "hash": None,
+        "duration": None, "tracks": None, "tempo": None,
+        "lowNote": None, "highNote": None, "noteCount": None,
+        "coverage61": None, "coverage88": None, "chordDensity": None, "hasDrums": None,
+        "error": None, "scannedAt": time.time(),
+    }
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        row["hash"] = hashlib.sha1(data).hexdigest()
+        mid = mido.MidiFile(file=io.BytesIO(data), clip=True)
+
+        length = 0.0
+        tempo = None
+        notes = []            # every sounding note_on, for the coverage ratios
+        chordNotes = 0        # note_ons sharing their timestamp with another one
+        blockNotes = 0
+        hasDrums = False
+
+        # one merged pass, the same order playback uses
+        for msg in mid:
+            if msg.time:
+                length += msg.time
+                if blockNotes > 1:
+                    chordNotes += blockNotes
+                blockNotes = 0
+            if msg.type == "note_on" and msg.velocity > 0:
+                if msg.channel == DRUM_CHANNEL:
+                    hasDrums = True
+                    continue
+                notes.append(msg.note)
+                blockNotes += 1
+            elif tempo is None and msg.type == "set_tempo":
+                tempo = msg.tempo
+        if blockNotes > 1:
+            chordNotes += blockNotes
+
+        row.update(
+            duration=length,
+            tracks=len(mid.tracks),
+            tempo=round(mido.tempo2bpm(tempo if tempo is not None else DEFAULT_TEMPO), 2),
+            noteCount=len(notes),
+            hasDrums=int(hasDrums),
+        )
+        if notes:
+            row["lowNote"], row["highNote"] = min(notes), max(notes)
+            for name, (low, high) in KEY_RANGES.items():
+                row[f"coverage{name}"] = round(sum(low <= n <= high for n in notes) / len(notes), 4)
+            row["chordDensity"] = round(chordNotes / len(notes), 4)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        logger.debug(f"could not analyze {path}: {row['error']}")
+    return row
+
+
+def _analyzeOrNone(path: str):
+    try:
+        return analyzeFile(path)
+    except OSError:
+        return None  # vanished or unreadable between listing and parsing
+
+
+def analyzeMany(paths, processes=None):
+    """
+    Yield a row per readable path, in the order given.
+
+    processes works as in poolMap().
+    """
+    for row in poolMap(_analyzeOrNone, paths, processes):
+        if row is not None:
+            yield row
+
+
+@contextlib.contextmanager
+def workerEnvironment():
+    """Expose WORKER_ENV to processes started inside the block without keeping it in ours."""
+    previous = {key: os.environ.get(key) for key in WORKER_ENV}
+    os.environ.update(WORKER_ENV)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def poolMap(fn, items, processes=None):
+    """
+    Yield fn(item) for every item, in order. fn must be picklable and
+    live in a module that doesn't import modules.configuration.
+
+    processes=None uses every core once there are MIN_PARALLEL items or
+    more; processes=1 always stays in this process.
+    """
+    items = list(items)
+    if processes is None:
+        processes = (os.cpu_count() or 1) if len(items) >= MIN_PARALLEL else 1
+
+    if processes <= 1:
+        yield from map(fn, items)
+        return
+
+    # a few chunks per worker keeps the pool busy without per-item IPC
+    chunksize = max(1, len(items) // (processes * 8))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+        # map() submits every chunk up front, which starts all the workers
+        with workerEnvironment():
+            results = pool.map(fn, items, chunksize=chunksize)
+        yield from results
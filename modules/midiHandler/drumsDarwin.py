@@ -7,6 +7,8 @@ from pynput import keyboard as pynputKeyboard
 
 from modules import configuration
 from modules.functions import mainFunctions
+from modules.midiHandler import latencyStats
+from modules.midiHandler.playbackGate import PlaybackGate
 
 pressedKeys = set()
 heldKeys = set()
@@ -87,12 +89,15 @@ drumsMap = {
 }
 
 stopEvent = threading.Event()
+gate = PlaybackGate(stopEvent)
 clockThreadRef = None
 playThread = None
 timerList = []
 paused = False
 closeThread = False
 playbackSpeed = 1.0
+finishedCallback = None
+latency = latencyStats.LatencySession()
 keyboardHandlers = []
 
 def pressAndMaybeRelease(key):
@@ -126,22 +131,22 @@ def playMidiOnce(filePath):
                 adjustedDelay *= speedFactor
         currentTime += adjustedDelay
         targetTime = startTime + currentTime
-        while time.monotonic() < targetTime:
+        while True:
             if stopEvent.is_set() or closeThread:
                 return False
-            while paused and not (stopEvent.is_set() or closeThread):
-                pauseStart = time.monotonic()
-                time.sleep(0.05)
-                pauseDuration = time.monotonic() - pauseStart
+            if paused:
+                pauseDuration = gate.waitWhilePaused()
                 startTime += pauseDuration
                 targetTime += pauseDuration
-            remaining = targetTime - time.monotonic()
-            if remaining > 0:
-                sleepChunk = min(remaining, 0.005)
-                time.sleep(sleepChunk)
+                continue
+            # wakes early on pause/stop, otherwise returns at targetTime
+            if gate.sleepUntil(targetTime):
+                break
         if msg.is_meta:
             continue
-        parseMidi(msg)
+        if latency.enabled:
+            latency.due(targetTime)
+        latency.timed(parseMidi, msg)
     return True
 
 def playMidiFile(filePath):
@@ -152,9 +157,14 @@ def playMidiFile(filePath):
         for key in list(heldKeys):
             release(key)
 
+    latency.writeReport("drumsDarwin", filePath)
+
     if not configuration.configData["drumsMacro"]["loopSong"]:
-        from modules.functions.drumsMacroFunctions import stopPlayback
-        stopPlayback()
+        if finishedCallback:
+            finishedCallback()
+        else:
+            from modules.functions.drumsMacroFunctions import stopPlayback
+            stopPlayback()
 
 def formatTime(seconds):
     hours = int(seconds // 3600)
@@ -175,20 +185,24 @@ def clockThread(totalSeconds, updateCallback=None):
                 else:
                     log(formattedTime)
             currentSeconds += 1
-            for _ in range(10):
+            deadline = time.monotonic() + 1.0 / max(0.1, playbackSpeed)
+            while not gate.sleepUntil(deadline):
                 if stopEvent.is_set() or closeThread:
-                    break
-                time.sleep(0.1 / playbackSpeed)
+                    return
+                deadline += gate.waitWhilePaused()
         else:
-            time.sleep(0.1)
+            gate.waitWhilePaused()
 
-def startPlayback(filePath, updateCallback=None):
-    global playThread, stopEvent, clockThreadRef, closeThread, paused
+def startPlayback(filePath, updateCallback=None, onFinished=None):
+    global finishedCallback, playThread, stopEvent, clockThreadRef, closeThread, paused, latency
     stopEvent.clear()
     closeThread = False
     paused = False
+    gate.setPaused(False)
     if playThread is not None and isinstance(playThread, threading.Thread) and playThread.is_alive():
         return
+    finishedCallback = onFinished
+    latency = latencyStats.begin()
     totalSeconds = mido.MidiFile(filePath, clip=True).length
     playThread = threading.Thread(target=playMidiFile, args=(filePath,), daemon=True)
     clockThreadRef = threading.Thread(target=clockThread, args=(totalSeconds, updateCallback), daemon=True)
@@ -198,6 +212,7 @@ def startPlayback(filePath, updateCallback=None):
 def pausePlayback():
     global paused
     paused = not paused
+    gate.setPaused(paused)
     if paused and configuration.configData["drumsMacro"]["releaseOnPause"]:
         for key in list(heldKeys):
             release(key)
@@ -210,6 +225,7 @@ def changeSpeed(amount):
 def stopPlayback():
     global closeThread, stopEvent, playThread, clockThreadRef, timerList, keyboardHandlers
     stopEvent.set()
+    gate.wake()
     closeThread = True
     for key in list(heldKeys):
         try:
@@ -6,6 +6,8 @@ import threading
 from modules import configuration
 from modules.functions import mainFunctions
 from modules.midiHandler import midiLinux as sharedMidiLinux  # reuse uinput
+from modules.midiHandler import latencyStats
+from modules.midiHandler.playbackGate import PlaybackGate
 
 pressedKeys = set()
 heldKeys = set()
@@ -13,11 +15,14 @@ timerList = []
 keyboardHandlers = []
 
 stopEvent = threading.Event()
+gate = PlaybackGate(stopEvent)
 clockThreadRef = None
 playThread = None
 paused = False
 closeThread = False
 playbackSpeed = 1.0
+finishedCallback = None
+latency = latencyStats.LatencySession()
 
 log = mainFunctions.log
 
@@ -90,20 +95,19 @@ def playMidiOnce(filePath):
         currentTime += adjustedDelay
         targetTime = startTime + currentTime
 
-        while time.monotonic() < targetTime:
+        while True:
             if stopEvent.is_set() or closeThread:
                 return False
 
-            while paused and not (stopEvent.is_set() or closeThread):
-                pauseStart = time.monotonic()
-                time.sleep(0.05)
-                pauseDuration = time.monotonic() - pauseStart
+            if paused:
+                pauseDuration = gate.waitWhilePaused()
                 startTime += pauseDuration
                 targetTime += pauseDuration
+                continue
 
-            remaining = targetTime - time.monotonic()
-            if remaining > 0:
-                time.sleep(min(remaining, 0.005))
+            # wakes early on pause/stop, otherwise returns at targetTime
+            if gate.sleepUntil(targetTime):
+                break
 
         if msg.is_meta:
             continue
@@ -111,7 +115,10 @@ def playMidiOnce(filePath):
         if paused:
             continue
 
-        parseMidi(msg)
+        if latency.enabled:
+            latency.due(targetTime)
+
+        latency.timed(parseMidi, msg)
 
     return True
 
@@ -126,24 +133,36 @@ def playMidiFile(filePath):
         for k in list(heldKeys):
             release(k)
 
-    if not configuration.configData["drumsMacro"]["loopSong"]:
-        from modules.functions.drumsMacroFunctions import stopPlayback as stopPlaybackUI
-        stopPlaybackUI()
+    latency.writeReport("drums", filePath)
 
-def startPlayback(filePath, updateCallback=None):
-    global playThread, clockThreadRef, closeThread, paused
+    if not configuration.configData["drumsMacro"]["loopSong"]:
+        if finishedCallback:
+            finishedCallback()
+        else:
+            from modules.functions.drumsMacroFunctions import stopPlayback as stopPlaybackUI
+            stopPlaybackUI()
+
+def startPlayback(filePath, updateCallback=None, onFinished=None):
+    global finishedCallback, playThread, clockThreadRef, closeThread, paused, latency
     stopEvent.clear()
     closeThread = False
     paused = False
+    gate.setPaused(False)
     if playThread and playThread.is_alive():
         return
 
+    # fail here (with a logged reason) rather than on the first note
+    sharedMidiLinux.openDevice()
+
+    finishedCallback = onFinished
+    latency = latencyStats.begin()
     playThread = threading.Thread(target=playMidiFile, args=(filePath,), daemon=True)
     playThread.start()
 
 def pausePlayback():
     global paused
     paused = not paused
+    gate.setPaused(paused)
     if paused and configuration.configData["drumsMacro"]["releaseOnPause"]:
         for k in list(heldKeys):
             release(k)
@@ -160,6 +179,7 @@ def stopPlayback():
         return
 
     stopEvent.set()
+    gate.wake()
     closeThread = True
 
     for k in list(heldKeys):
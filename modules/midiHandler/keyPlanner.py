@@ -0,0 +1,74 @@
+import re
+
+# ============================================================
+# KEYSTROKE PLANNER
+# ============================================================
+# Turns MIDI notes into (modifier, key) strokes the way the
+# piano maps expect, and orders a chord so that notes sharing a
+# modifier are emitted back-to-back.
+#
+# Kept free of any input backend so it can be reused offline.
+
+SHIFTED_KEYS = re.compile(r"[!@$%^*(]")  # how upstream encodes shifted number row in maps
+
+# order modifier groups are emitted in within a chord
+MODIFIER_ORDER = {None: 0, "shift": 1, "ctrl": 2}
+
+
+def resolveMappedKey(note: int, pianoMap, allow88: bool):
+    """Return the mapped key for a note (or None) plus the 61-key map."""
+    letterNoteMap = pianoMap["61keyMap"]
+    note_s = str(note)
+
+    if note_s in letterNoteMap:
+        return letterNoteMap[note_s], letterNoteMap
+    if allow88:
+        lowNotes = pianoMap["88keyMap"]["lowNotes"]
+        if note_s in lowNotes:
+            return lowNotes[note_s], letterNoteMap
+        highNotes = pianoMap["88keyMap"]["highNotes"]
+        if note_s in highNotes:
+            return highNotes[note_s], letterNoteMap
+
+    return None, letterNoteMap
+
+
+def keystroke(note: int, key, letterNoteMap):
+    """
+    Resolve a mapped key to the physical stroke that plays it.
+
+    Returns (modifier, key) where modifier is None, "shift" or "ctrl",
+    or None if the note cannot be played.
+    """
+    if 36 <= note <= 96:
+        if SHIFTED_KEYS.search(str(key)):
+            prev_key = letterNoteMap.get(str(note - 1))
+            if not prev_key:
+                return None
+            return "shift", prev_key
+        if isinstance(key, str) and key.isupper():
+            return "shift", key.lower()
+        return None, key
+    return "ctrl", str(key)
+
+
+def modifierFor(note: int, pianoMap, allow88: bool):
+    """Modifier a note_on would need, used only for ordering."""
+    key, letterNoteMap = resolveMappedKey(note, pianoMap, allow88)
+    if key is None:
+        return None
+    stroke = keystroke(note, key, letterNoteMap)
+    return stroke[0] if stroke else None
+
+
+def planChord(messages, pianoMap, allow88: bool):
+    """
+    Group a chord's note_on messages by modifier (plain, shift, ctrl),
+    sorting the list in place and returning it.
+
+    The sort is stable, so notes inside a group keep the order they
+    came in. All notes of a block share one MIDI timestamp, so the
+    reordering never moves a note outside the chord's roll window.
+    """
+    messages.sort(key=lambda m: MODIFIER_ORDER[modifierFor(m.note, pianoMap, allow88)])
+    return messages
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import datetime
+import logging
+
+from modules import configuration
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# PLAYBACK LATENCY STATS (opt-in)
+# ============================================================
+# Records, per emitted event (every note of a chord counts):
+# - lateness: how far after its due time the event went out. Engines
+#   call due() with each block's targetTime and delayDue() for pauses
+#   they insert on purpose (chord roll), so a note late because the
+#   notes before it in its block were slow to send shows up here
+# - dispatch: how long simulateKey / the output send took
+#
+# Enabled by "midiPlayer.latencyStats" in config. Each engine gets its
+# own LatencySession from begin() (drums and piano can play at once),
+# and when the song ends the percentiles are written as JSON into the
+# logs folder, next to the nanoMIDIPlayer_*.log files.
+
+logDir = os.path.join(configuration.baseDirectory, "logs")
+reportsToKeep = 9
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram over microseconds.
+
+    Values below 2**subBits are stored exactly; above that each power
+    of two is split into 2**(subBits - 1) linear buckets, which keeps
+    the relative error under 1% with a fixed, small bucket array.
+    """
+
+    def __init__(self, subBits: int = 7, maxSeconds: float = 60.0):
+        self.subBits = subBits
+        self.halfCount = 1 << (subBits - 1)
+        self.maxValue = int(maxSeconds * 1_000_000)
+        self.counts = [0] * (self._index(self.maxValue) + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self.subBits)
+        return shift * self.halfCount + (value >> shift)
+
+    def _valueAt(self, index: int) -> int:
+        if index < 2 * self.halfCount:
+            return index
+        shift = index // self.halfCount - 1
+        top = index - shift * self.halfCount
+        return (top << shift) + ((1 << shift) >> 1)
+
+    def record(self, seconds: float):
+        value = min(self.maxValue, max(0, int(seconds * 1_000_000)))
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> int:
+        """Value (µs) at or below which p percent of samples fall."""
+        if not self.total:
+            return 0
+        wanted = max(1, int(round(self.total * p / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(self._valueAt(index), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "mean_us": round(self.sum / self.total, 1) if self.total else 0,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max,
+        }
+
+
+def _pruneReports():
+    try:
+        reports = sorted(
+            os.path.join(logDir, f) for f in os.listdir(logDir)
+            if f.startswith("nanoMIDIPlayer_latency_") and f.endswith(".json")
+        )
+        for path in reports[:-reportsToKeep]:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+class LatencySession:
+    """One engine's stats for one song. Disabled sessions cost a single attribute check."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.eventDue = 0.0         # time.monotonic() the next timed() event was due
+        self.lateness = LatencyHistogram()
+        self.dispatch = LatencyHistogram()
+
+    def due(self, targetTime: float):
+        """The events dispatched next were due at targetTime (time.monotonic())."""
+        self.eventDue = targetTime
+
+    def delayDue(self, seconds: float):
+        """The engine is about to wait this long on purpose; don't count it as lateness."""
+        self.eventDue += seconds
+
+    def timed(self, fn, *args):
+        """Call fn(*args), recording its lateness and duration when stats are on."""
+        if not self.enabled:
+            return fn(*args)
+        self.lateness.record(time.monotonic() - self.eventDue)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.dispatch.record(time.perf_counter() - start)
+
+    def writeReport(self, engine: str, midiFile: str):
+        """Write the session's percentiles to the logs folder. Returns the path or None."""
+        if not self.enabled or not (self.lateness.total or self.dispatch.total):
+            return None
+
+        now = datetime.datetime.now()
+        report = {
+            "engine": engine,
+            "file": midiFile,
+            "written": now.isoformat(timespec="seconds"),
+            "lateness": self.lateness.summary(),
+            "dispatch": self.dispatch.summary(),
+        }
+
+        try:
+            os.makedirs(logDir, exist_ok=True)
+            path = os.path.join(
+                logDir,
+                f"nanoMIDIPlayer_latency_{now.strftime('%Y-%m-%d_%H-%M-%S')}_{engine}.json"
+            )
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            logger.warning(f"latency report could not be written: {e}")
+            return None
+
+        _pruneReports()
+        logger.info(
+            f"latency [{engine}] late p50={report['lateness']['p50_us']}us "
+            f"p99={report['lateness']['p99_us']}us max={report['lateness']['max_us']}us | "
+            f"dispatch p50={report['dispatch']['p50_us']}us p99={report['dispatch']['p99_us']}us "
+            f"max={report['dispatch']['max_us']}us → {path}"
+        )
+        return path
+
+
+def begin() -> LatencySession:
+    """A fresh session for one engine's song, picking up the config switch."""
+    return LatencySession(bool(configuration.configData["midiPlayer"].get("latencyStats", False)))
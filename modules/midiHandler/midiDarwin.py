@@ -1,6 +1,5 @@
 import re
 import keyboard
-import mido
 import os
 import threading
 import time
@@ -9,6 +8,10 @@ import random
 from pynput import keyboard as pynputKeyboard
 from modules.functions import mainFunctions
 from modules import configuration
+from modules.midiHandler import latencyStats
+from modules.midiHandler.playbackGate import PlaybackGate
+from modules.midiHandler import threadTuning
+from modules.midiHandler import timeline
 
 pressedKeys = set()
 heldKeys = set()
@@ -90,6 +93,7 @@ def release(key):
             heldKeys.remove(keyObj)
 
 stopEvent = threading.Event()
+gate = PlaybackGate(stopEvent)
 clockThreadRef = None
 keyboardHandlers = []
 timerList = []
@@ -99,6 +103,10 @@ paused = False
 playThread = None
 playbackSpeed = 1.0
 sustainActive = False
+songPosition = 0.0
+finishedCallback = None
+latency = latencyStats.LatencySession()
+transposeSemitones = 0
 
 def findVelocityKey(velocity):
     velocityMap = configuration.configData["midiPlayer"]["pianoMap"]["velocityMap"]
@@ -200,26 +208,27 @@ def parseMidi(message):
     elif message.type in ("note_on", "note_off"):
         try:
             if message.velocity == 0:
-                simulateKey("note_off", message.note, message.velocity)
+                latency.timed(simulateKey, "note_off", message.note, message.velocity)
             else:
-                simulateKey(message.type, message.note, message.velocity)
+                latency.timed(simulateKey, message.type, message.note, message.velocity)
         except IndexError:
             pass
     return sustainActive
 
 def playMidiOnce(midiFile):
-    global sustainActive, paused
-    mid = mido.MidiFile(midiFile, clip=True)
+    global sustainActive, paused, songPosition
+    song = midiFile if isinstance(midiFile, timeline.Timeline) else timeline.compileTimeline(midiFile)
+    songPosition = 0.0
     startTime = time.monotonic()
     currentTime = 0
     wasPaused = False
     
-    for msg in mid:
+    for delay, block in zip(song.delays, song.blocks):
         if stopEvent.is_set() or closeThread:
             return False
         
-        adjustedDelay = msg.time / playbackSpeed
-        if configuration.configData["midiPlayer"]["randomFail"]["enabled"] and not msg.is_meta:
+        adjustedDelay = delay / playbackSpeed
+        if configuration.configData["midiPlayer"]["randomFail"]["enabled"]:
             if random.random() < configuration.configData["midiPlayer"]["randomFail"]["speed"] / 100:
                 speedFactor = random.uniform(0.5, 1.5)
                 adjustedDelay *= speedFactor
@@ -227,7 +236,7 @@ def playMidiOnce(midiFile):
         currentTime += adjustedDelay
         targetTime = startTime + currentTime
         
-        while time.monotonic() < targetTime:
+        while True:
             if stopEvent.is_set() or closeThread:
                 return False
             
@@ -243,72 +252,88 @@ def playMidiOnce(midiFile):
             if not paused and wasPaused:
                 wasPaused = False
 
-            while paused and not (stopEvent.is_set() or closeThread):
-                pauseStart = time.monotonic()
-                time.sleep(0.05)
-                pauseDuration = time.monotonic() - pauseStart
+            if paused:
+                pauseDuration = gate.waitWhilePaused()
                 startTime += pauseDuration
                 targetTime += pauseDuration
+                continue
             
-            remaining = targetTime - time.monotonic()
-            if remaining > 0:
-                sleepChunk = min(remaining, 0.005)
-                time.sleep(sleepChunk)
-                
-        if msg.is_meta:
-            continue
-        
-        if paused:
-            if msg.type == "control_change" and msg.control == 64:
-                if not configuration.configData["midiPlayer"]["sustain"]:
-                    continue
-                if msg.value > configuration.configData["midiPlayer"]["sustainCutoff"]:
-                    sustainActive = True
-                else:
-                    sustainActive = False
-            continue
+            # wakes early on pause/stop, otherwise returns at targetTime
+            if gate.sleepUntil(targetTime):
+                break
+
+        songPosition += delay
+
+        if latency.enabled and not paused:
+            latency.due(targetTime)
+
+        for msg in block:
+            if paused:
+                if msg.type == "control_change" and msg.control == 64:
+                    if not configuration.configData["midiPlayer"]["sustain"]:
+                        continue
+                    if msg.value > configuration.configData["midiPlayer"]["sustainCutoff"]:
+                        sustainActive = True
+                    else:
+                        sustainActive = False
+                continue
         
-        if hasattr(msg, "note"):
-            if msg.type == "note_on" and msg.velocity > 0:
-                if configuration.configData["midiPlayer"]["randomFail"]["enabled"] and random.random() < configuration.configData["midiPlayer"]["randomFail"]["transpose"] / 100:
-                    delta = random.randint(-12, 12)
-                    newNote = msg.note + delta
-                    if msg.note not in activeTransposedNotes:
-                        activeTransposedNotes[msg.note] = []
-                    activeTransposedNotes[msg.note].append(newNote)
-                    original = msg.note
-                    msg.note = newNote
-                    parseMidi(msg)
-                    msg.note = original
-                    continue
-            if msg.type == "note_off" or (msg.type == "note_on" and msg.velocity == 0):
-                if msg.note in activeTransposedNotes and activeTransposedNotes[msg.note]:
-                    transNote = activeTransposedNotes[msg.note].pop(0)
-                    if not activeTransposedNotes[msg.note]:
-                        del activeTransposedNotes[msg.note]
-                    original = msg.note
-                    msg.note = transNote
-                    parseMidi(msg)
-                    msg.note = original
-                    continue
+            if hasattr(msg, "note"):
+                if msg.type == "note_on" and msg.velocity > 0:
+                    if configuration.configData["midiPlayer"]["randomFail"]["enabled"] and random.random() < configuration.configData["midiPlayer"]["randomFail"]["transpose"] / 100:
+                        delta = random.randint(-12, 12)
+                        newNote = msg.note + delta
+                        if msg.note not in activeTransposedNotes:
+                            activeTransposedNotes[msg.note] = []
+                        activeTransposedNotes[msg.note].append(newNote)
+                        original = msg.note
+                        msg.note = newNote
+                        parseMidi(msg)
+                        msg.note = original
+                        continue
+                if msg.type == "note_off" or (msg.type == "note_on" and msg.velocity == 0):
+                    if msg.note in activeTransposedNotes and activeTransposedNotes[msg.note]:
+                        transNote = activeTransposedNotes[msg.note].pop(0)
+                        if not activeTransposedNotes[msg.note]:
+                            del activeTransposedNotes[msg.note]
+                        original = msg.note
+                        msg.note = transNote
+                        parseMidi(msg)
+                        msg.note = original
+                        continue
                 
-        parseMidi(msg)
+            parseMidi(msg)
     
     return True
 
-def playMidiFile(midiFile):
+def playMidiFile(midiFile, song=None):
     log("nanoMIDI Mid2VK Translator v3.0")
     log(f"Playing MIDI file: {midiFile}")
-    while not (stopEvent.is_set() or closeThread):
-        finished = playMidiOnce(midiFile)
-        if not configuration.configData["midiPlayer"]["loopSong"] or not finished or stopEvent.is_set() or closeThread:
-            break
-        for key in list(heldKeys):
-            release(key)
+
+    tuning = threadTuning.tunePlaybackThread()
+    if tuning:
+        log(f"Performance mode: {tuning}")
+
+    if song is None:
+        song = timeline.compileTimeline(midiFile)
+
+    with threadTuning.gcFrozen():
+        while not (stopEvent.is_set() or closeThread):
+            with threadTuning.gcPaused():
+                finished = playMidiOnce(song)
+            if not configuration.configData["midiPlayer"]["loopSong"] or not finished or stopEvent.is_set() or closeThread:
+                break
+            for key in list(heldKeys):
+                release(key)
+
+    latency.writeReport("darwin", midiFile)
 
     if not configuration.configData["midiPlayer"]["loopSong"]:
-        from modules.functions.midiPlayerFunctions import stopPlayback
-        stopPlayback()
+        if finishedCallback:
+            finishedCallback()
+        else:
+            from modules.functions.midiPlayerFunctions import stopPlayback
+            stopPlayback()
 
 def formatTime(seconds):
     hours = int(seconds // 3600)
@@ -329,29 +354,34 @@ def clockThread(totalSeconds, updateCallback=None):
                 else:
                     log(formattedTime)
             currentSeconds += 1
-            for _ in range(10):
+            deadline = time.monotonic() + 1.0 / max(0.1, playbackSpeed)
+            while not gate.sleepUntil(deadline):
                 if stopEvent.is_set() or closeThread:
-                    break
-                time.sleep(0.1 / playbackSpeed)
+                    return
+                deadline += gate.waitWhilePaused()
         else:
-            time.sleep(0.1)
+            gate.waitWhilePaused()
 
-def startPlayback(midiFile, updateCallback=None):
-    global playThread, stopEvent, clockThreadRef, closeThread, paused
+def startPlayback(midiFile, updateCallback=None, onFinished=None):
+    global playThread, stopEvent, clockThreadRef, closeThread, paused, finishedCallback, latency
     stopEvent.clear()
     closeThread = False
     paused = False
+    gate.setPaused(False)
     if playThread is not None and isinstance(playThread, threading.Thread) and playThread.is_alive():
         return
-    totalSeconds = mido.MidiFile(midiFile, clip=True).length
-    playThread = threading.Thread(target=playMidiFile, args=(midiFile,), daemon=True)
-    clockThreadRef = threading.Thread(target=clockThread, args=(totalSeconds, updateCallback), daemon=True)
+    finishedCallback = onFinished
+    song = timeline.compileTimeline(midiFile, transposeSemitones)
+    latency = latencyStats.begin()
+    playThread = threading.Thread(target=playMidiFile, args=(midiFile, song), daemon=True)
+    clockThreadRef = threading.Thread(target=clockThread, args=(song.length, updateCallback), daemon=True)
     clockThreadRef.start()
     playThread.start()
 
 def pausePlayback():
     global paused, sustainActive
     paused = not paused
+    gate.setPaused(paused)
     
     if paused:
         if configuration.configData["midiPlayer"]["releaseOnPause"]:
@@ -374,6 +404,7 @@ def stopPlayback():
         return
     
     stopEvent.set()
+    gate.wake()
     closeThread = True
     for key in list(heldKeys):
         try:
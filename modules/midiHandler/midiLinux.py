@@ -1,12 +1,15 @@
-import re
+import atexit
 import random
 import threading
 import time
 
-import mido
-
 from modules import configuration
 from modules.functions import mainFunctions
+from modules.midiHandler import keyPlanner
+from modules.midiHandler import latencyStats
+from modules.midiHandler.playbackGate import PlaybackGate
+from modules.midiHandler import threadTuning
+from modules.midiHandler import timeline
 
 # --- UINPUT ONLY (Wayland-safe) ---
 from evdev import UInput, ecodes as e
@@ -71,9 +74,23 @@ def humanize_block(messages):
     - No arpeggio effect
     - No audible timing damage
     """
+    note_ons = []
+    others = []
+    for m in messages:
+        if not m.is_meta and m.type == "note_on" and getattr(m, "velocity", 0) > 0:
+            note_ons.append(m)
+        else:
+            others.append(m)
+
+    humanize_split(others, note_ons)
 
-    note_ons = [m for m in messages if (not m.is_meta and m.type == "note_on" and getattr(m, "velocity", 0) > 0)]
-    others = [m for m in messages if m not in note_ons]
+
+def humanize_split(others, note_ons):
+    """
+    humanize_block() for a block that is already partitioned, as the
+    compiled timeline stores it. note_ons is shuffled in place.
+    """
+    global coalesceModifiers
 
     # Dispatch pedals / note_off immediately
     for m in others:
@@ -110,18 +127,35 @@ def humanize_block(messages):
     # slight randomness so spacing isn't perfectly even
     random.shuffle(note_ons)
 
-    for i, msg in enumerate(note_ons):
+    # group shifted / ctrl / plain notes so each modifier toggles once per chord
+    keyPlanner.planChord(
+        note_ons,
+        configuration.configData["midiPlayer"]["pianoMap"],
+        configuration.configData["midiPlayer"]["88Keys"],
+    )
+
+    coalesceModifiers = True
+    try:
+        for i, msg in enumerate(note_ons):
+            if not humanizeChords:
+                dispatch_message(msg)
+                continue
 
-        if i > 0:
-            jitter = random.uniform(0.75, 1.35)
-            time.sleep(per_note * jitter)
+            if i > 0:
+                jitter = random.uniform(0.75, 1.35)
+                latency.delayDue(per_note * jitter)
+                time.sleep(per_note * jitter)
 
-        # micro timing for finger inaccuracy
-        micro = random.uniform(-0.002, 0.004)
-        if micro > 0:
-            time.sleep(micro)
+            # micro timing for finger inaccuracy
+            micro = random.uniform(-0.002, 0.004)
+            if micro > 0:
+                latency.delayDue(micro)
+                time.sleep(micro)
 
-        dispatch_message(msg)
+            dispatch_message(msg)
+    finally:
+        coalesceModifiers = False
+        useModifier(None)
 
 # ------------------------
 # UINPUT DEVICE
@@ -141,12 +175,50 @@ KEY_MAP = {
     "alt": e.KEY_LEFTALT,
 }
 
-_ui = UInput({e.EV_KEY: list(set(KEY_MAP.values()))}, name="nanoMIDIPlayer-uinput", bustype=e.BUS_USB)
+# Created on first playback (not at import) and kept for the whole session,
+# so importing this module never needs /dev/uinput access.
+_ui = None
+_uiLock = threading.Lock()
+
+
+def openDevice():
+    """Return the shared uinput device, creating it on first use."""
+    global _ui
+    if _ui is not None:
+        return _ui
+    with _uiLock:
+        if _ui is None:
+            _ui = UInput({e.EV_KEY: list(set(KEY_MAP.values()))}, name="nanoMIDIPlayer-uinput", bustype=e.BUS_USB)
+            log("uinput device opened.")
+    return _ui
+
+
+def closeDevice():
+    """Release anything still held and destroy the uinput device."""
+    global _ui
+    if _ui is None:
+        return
+    try:
+        release_all()
+    except Exception:
+        pass
+    with _uiLock:
+        try:
+            _ui.close()
+        except Exception:
+            pass
+        _ui = None
+
+
+atexit.register(closeDevice)
 
 heldKeys = set()                 # keys currently held down (strings)
+heldModifier = None              # modifier kept down across a chord block
+coalesceModifiers = False        # True while humanize_block emits a chord
 activeTransposedNotes = {}       # original_note -> [transposed_notes...]
 
 stopEvent = threading.Event()
+gate = PlaybackGate(stopEvent)
 clockThreadRef = None
 playThread = None
 timerList = []
@@ -155,6 +227,11 @@ paused = False
 closeThread = False
 playbackSpeed = 1.0
 sustainActive = False
+songPosition = 0.0               # seconds into the song, in file time
+finishedCallback = None          # called instead of the UI stop when a song ends
+latency = latencyStats.LatencySession()  # this engine's stats; startPlayback takes a fresh one
+transposeSemitones = 0           # applied when startPlayback compiles the song
+humanizeChords = True            # roll chords like a hand; False plays them stacked
 
 
 # ------------------------
@@ -179,8 +256,9 @@ def press(key):
     k = _norm_key(key)
     if k in heldKeys:
         return
-    _ui.write(e.EV_KEY, code, 1)
-    _ui.syn()
+    ui = openDevice()
+    ui.write(e.EV_KEY, code, 1)
+    ui.syn()
     heldKeys.add(k)
 
 
@@ -190,7 +268,7 @@ def release(key):
     if code is None:
         return
     k = _norm_key(key)
-    if k not in heldKeys:
+    if k not in heldKeys or _ui is None:
         return
     _ui.write(e.EV_KEY, code, 0)
     _ui.syn()
@@ -198,15 +276,29 @@ def release(key):
 
 
 def release_all():
+    global heldModifier
     for k in list(heldKeys):
         release(k)
+    heldModifier = None
+
+
+def useModifier(modifier):
+    """Switch the held modifier, touching the device only when it changes."""
+    global heldModifier
+    if heldModifier == modifier:
+        return
+    if heldModifier:
+        release(heldModifier)
+    if modifier:
+        press(modifier)
+    heldModifier = modifier
 
 
 # ------------------------
 # MIDI → KEY TRANSLATION
 # ------------------------
 
-_SPECIAL_SHIFTED = re.compile(r"[!@$%^*(]")  # how upstream encodes shifted number row in maps
+_SPECIAL_SHIFTED = keyPlanner.SHIFTED_KEYS
 
 
 def findVelocityKey(velocity: int) -> str:
@@ -238,29 +330,11 @@ def pressAndMaybeRelease(key: str):
 
 
 def _resolveMappedKey(note: int):
-    allow88 = configuration.configData["midiPlayer"]["88Keys"]
-
-    letterNoteMap = configuration.configData["midiPlayer"]["pianoMap"]["61keyMap"]
-    lowNotes = configuration.configData["midiPlayer"]["pianoMap"]["88keyMap"]["lowNotes"]
-    highNotes = configuration.configData["midiPlayer"]["pianoMap"]["88keyMap"]["highNotes"]
-
-    note_s = str(note)
-
-    if not allow88:
-        if note_s not in letterNoteMap:
-            return None, letterNoteMap
-    else:
-        if note_s not in letterNoteMap and note_s not in lowNotes and note_s not in highNotes:
-            return None, letterNoteMap
-
-    if note_s in letterNoteMap:
-        return letterNoteMap[note_s], letterNoteMap
-    if allow88 and note_s in lowNotes:
-        return lowNotes[note_s], letterNoteMap
-    if allow88 and note_s in highNotes:
-        return highNotes[note_s], letterNoteMap
-
-    return None, letterNoteMap
+    return keyPlanner.resolveMappedKey(
+        note,
+        configuration.configData["midiPlayer"]["pianoMap"],
+        configuration.configData["midiPlayer"]["88Keys"],
+    )
 
 
 def simulateKey(msgType: str, note: int, velocity: int):
@@ -273,6 +347,7 @@ def simulateKey(msgType: str, note: int, velocity: int):
         # velocity layer (Alt + velocityKey)
         if configuration.configData["midiPlayer"]["velocity"]:
             velocityKey = findVelocityKey(velocity)
+            useModifier(None)
             press("alt")
             press(velocityKey)
             release(velocityKey)
@@ -288,24 +363,19 @@ def simulateKey(msgType: str, note: int, velocity: int):
                         release(prev)
                 else:
                     release(str(key))
-
-            if _SPECIAL_SHIFTED.search(str(key)):
-                prev_key = letterNoteMap.get(str(note - 1))
-                if prev_key:
-                    press("shift")
-                    pressAndMaybeRelease(prev_key)
-                    release("shift")
-            elif isinstance(key, str) and key.isupper():
-                press("shift")
-                pressAndMaybeRelease(key.lower())
-                release("shift")
-            else:
-                pressAndMaybeRelease(key)
         else:
             release(str(key))
-            press("ctrl")
-            pressAndMaybeRelease(str(key))
-            release("ctrl")
+
+        stroke = keyPlanner.keystroke(note, key, letterNoteMap)
+        if stroke is None:
+            return
+
+        # inside a chord block the modifier stays down until the group changes
+        modifier, strokeKey = stroke
+        useModifier(modifier)
+        pressAndMaybeRelease(strokeKey)
+        if not coalesceModifiers:
+            useModifier(None)
         return
 
     # NOTE OFF
@@ -336,9 +406,9 @@ def parseMidi(message):
     if message.type in ("note_on", "note_off"):
         try:
             if message.velocity == 0:
-                simulateKey("note_off", message.note, message.velocity)
+                latency.timed(simulateKey, "note_off", message.note, message.velocity)
             else:
-                simulateKey(message.type, message.note, message.velocity)
+                latency.timed(simulateKey, message.type, message.note, message.velocity)
         except IndexError:
             pass
     return sustainActive
@@ -422,47 +492,45 @@ def clockThread(totalSeconds: float, updateCallback=None):
                     log(formattedTime)
 
             currentSeconds += 1
-            for _ in range(10):
+            deadline = time.monotonic() + 1.0 / max(0.1, playbackSpeed)
+            while not gate.sleepUntil(deadline):
                 if stopEvent.is_set() or closeThread:
-                    break
-                time.sleep(0.1 / max(0.1, playbackSpeed))
+                    return
+                deadline += gate.waitWhilePaused()
         else:
-            time.sleep(0.1)
+            gate.waitWhilePaused()
+
 
+def playMidiOnce(midiFile):
+    """
+    Play once with pause-aware timing and upstream randomFail/transpose logic + chord humanizer.
 
-def playMidiOnce(midiFile: str):
-    """Play once with pause-aware timing and upstream randomFail/transpose logic + chord humanizer."""
-    global sustainActive, paused
+    midiFile may be a path or an already compiled timeline.Timeline.
+    """
+    global sustainActive, paused, songPosition
 
-    mid = mido.MidiFile(midiFile, clip=True)
-    it = iter(mid)
+    song = midiFile if isinstance(midiFile, timeline.Timeline) else timeline.compileTimeline(midiFile)
+    songPosition = 0.0
 
     startTime = time.monotonic()
     currentTime = 0.0
     wasPaused = False
 
-    pending = None
-
-    while True:
-        msg = pending if pending is not None else next(it, None)
-        pending = None
-        if msg is None:
-            break
-
+    for delay, others, note_ons in zip(song.delays, song.others, song.noteOns):
         if stopEvent.is_set() or closeThread:
             return False
 
-        adjustedDelay = msg.time / max(0.1, playbackSpeed)
+        adjustedDelay = delay / max(0.1, playbackSpeed)
 
         # random fail (timing)
-        if configuration.configData["midiPlayer"]["randomFail"]["enabled"] and not msg.is_meta:
+        if configuration.configData["midiPlayer"]["randomFail"]["enabled"]:
             if random.random() < configuration.configData["midiPlayer"]["randomFail"]["speed"] / 100:
                 adjustedDelay *= random.uniform(0.5, 1.5)
 
         currentTime += adjustedDelay
         targetTime = startTime + currentTime
 
-        while time.monotonic() < targetTime:
+        while True:
             if stopEvent.is_set() or closeThread:
                 return False
 
@@ -479,85 +547,93 @@ def playMidiOnce(midiFile: str):
                 wasPaused = False
 
             # keep timeline correct while paused
-            while paused and not (stopEvent.is_set() or closeThread):
-                pauseStart = time.monotonic()
-                time.sleep(0.05)
-                pauseDuration = time.monotonic() - pauseStart
+            if paused:
+                pauseDuration = gate.waitWhilePaused()
                 startTime += pauseDuration
                 targetTime += pauseDuration
+                continue
 
-            remaining = targetTime - time.monotonic()
-            if remaining > 0:
-                # tighter timing (less "chunky" than 5ms)
-                time.sleep(min(remaining, 0.001))
+            # wakes early on pause/stop, otherwise returns at targetTime
+            if gate.sleepUntil(targetTime):
+                break
 
-        if msg.is_meta:
-            continue
+        songPosition += delay
 
         if paused:
             # preserve sustain state changes while paused like upstream
-            if msg.type == "control_change" and msg.control == 64:
-                if not configuration.configData["midiPlayer"]["sustain"]:
-                    continue
-                if msg.value > configuration.configData["midiPlayer"]["sustainCutoff"]:
-                    sustainActive = True
-                else:
-                    sustainActive = False
+            for msg in others:
+                if msg.type == "control_change" and msg.control == 64:
+                    if not configuration.configData["midiPlayer"]["sustain"]:
+                        continue
+                    if msg.value > configuration.configData["midiPlayer"]["sustainCutoff"]:
+                        sustainActive = True
+                    else:
+                        sustainActive = False
             continue
 
-        # Build a same-timestamp block (delta-time == 0)
-        block = [msg]
-        while True:
-            nxt = next(it, None)
-            if nxt is None:
-                pending = None
-                break
-            if nxt.time == 0:
-                block.append(nxt)
-                continue
-            pending = nxt
-            break
+        if latency.enabled:
+            latency.due(targetTime)
 
-        # Humanize and dispatch that block
-        humanize_block(block)
+        # Humanize and dispatch the same-timestamp block
+        humanize_split(others, note_ons)
 
     return True
 
 
-def playMidiFile(midiFile: str):
+def playMidiFile(midiFile: str, song=None):
     log("nanoMIDI — uinput mode")
     log(f"Playing MIDI file: {midiFile}")
 
-    while not (stopEvent.is_set() or closeThread):
-        finished = playMidiOnce(midiFile)
+    tuning = threadTuning.tunePlaybackThread()
+    if tuning:
+        log(f"Performance mode: {tuning}")
 
-        if not configuration.configData["midiPlayer"]["loopSong"]:
-            break
-        if not finished:
-            break
+    if song is None:
+        song = timeline.compileTimeline(midiFile)
 
-        release_all()
+    with threadTuning.gcFrozen():
+        while not (stopEvent.is_set() or closeThread):
+            with threadTuning.gcPaused():
+                finished = playMidiOnce(song)
+
+            if not configuration.configData["midiPlayer"]["loopSong"]:
+                break
+            if not finished:
+                break
+
+            release_all()
+
+    latency.writeReport("uinput", midiFile)
 
     # ensure UI is reset
     if not configuration.configData["midiPlayer"]["loopSong"]:
-        from modules.functions.midiPlayerFunctions import stopPlayback
-        stopPlayback()
+        if finishedCallback:
+            finishedCallback()
+        else:
+            from modules.functions.midiPlayerFunctions import stopPlayback
+            stopPlayback()
 
 
-def startPlayback(midiFile: str, updateCallback=None):
-    global playThread, clockThreadRef, closeThread, paused
+def startPlayback(midiFile: str, updateCallback=None, onFinished=None):
+    global playThread, clockThreadRef, closeThread, paused, finishedCallback, latency
 
     stopEvent.clear()
     closeThread = False
     paused = False
+    gate.setPaused(False)
 
     if playThread is not None and isinstance(playThread, threading.Thread) and playThread.is_alive():
         return
 
-    totalSeconds = mido.MidiFile(midiFile, clip=True).length
+    # fail here (with a logged reason) rather than on the first note
+    openDevice()
+
+    finishedCallback = onFinished
+    song = timeline.compileTimeline(midiFile, transposeSemitones)
+    latency = latencyStats.begin()
 
-    playThread = threading.Thread(target=playMidiFile, args=(midiFile,), daemon=True)
-    clockThreadRef = threading.Thread(target=clockThread, args=(totalSeconds, updateCallback), daemon=True)
+    playThread = threading.Thread(target=playMidiFile, args=(midiFile, song), daemon=True)
+    clockThreadRef = threading.Thread(target=clockThread, args=(song.length, updateCallback), daemon=True)
     clockThreadRef.start()
     playThread.start()
 
@@ -565,6 +641,7 @@ def startPlayback(midiFile: str, updateCallback=None):
 def pausePlayback():
     global paused, sustainActive
     paused = not paused
+    gate.setPaused(paused)
 
     if paused and configuration.configData["midiPlayer"]["releaseOnPause"]:
         release_all()
@@ -588,6 +665,7 @@ def stopPlayback():
         return
 
     stopEvent.set()
+    gate.wake()
     closeThread = True
 
     # cancel timers
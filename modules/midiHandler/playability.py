@@ -0,0 +1,114 @@
+import json
+import hashlib
+import logging
+
+from modules.midiHandler import keyPlanner
+from modules.midiHandler.timeline import compileTimeline
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# PLAYABILITY ANALYSIS
+# ============================================================
+# Replays a compiled timeline through the piano map offline, the way
+# the key engines would emit it, and counts what the game input can't
+# keep up with:
+#   collisions      notes of one chord that need the same physical key
+#                   (e.g. "a" and "A"), so only one of them sounds
+#   noDoubles drops note_ons on a key another note still holds, which
+#                   cuts that note short (and, with noDoubles off, repeats
+#                   of a held note that never re-press the key)
+#   unplayable      notes outside the map, or shifted keys with no base
+#   modifier toggles shift/ctrl presses and releases, per second
+#   peak keys       most physical keys held at once (modifier included)
+# Like keyPlanner it never touches an input backend or config.json, so
+# analyzePath() can run in a process pool worker.
+
+
+def mapSignature(pianoMap, allow88: bool) -> str:
+    """Stable hash of the mapping a result was computed for."""
+    data = json.dumps([pianoMap, bool(allow88)], sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def analyzeTimeline(song, pianoMap, allow88: bool, noDoubles: bool = True) -> dict:
+    strokes = {}
+
+    def strokeFor(note):
+        if note not in strokes:
+            key, letterNoteMap = keyPlanner.resolveMappedKey(note, pianoMap, allow88)
+            strokes[note] = keyPlanner.keystroke(note, key, letterNoteMap) if key is not None else None
+        return strokes[note]
+
+    held = {}                 # physical key -> note holding it
+    modifier = None
+    toggles = 0
+    peakKeys = 0
+    notes = collisions = drops = unplayable = 0
+
+    def setModifier(new):
+        nonlocal modifier, toggles
+        if new == modifier:
+            return
+        toggles += (modifier is not None) + (new is not None)
+        modifier = new
+
+    for others, noteOns in zip(song.others, song.noteOns):
+        for msg in others:
+            if msg.type in ("note_on", "note_off"):
+                stroke = strokeFor(msg.note)
+                if stroke is not None and held.get(stroke[1]) == msg.note:
+                    del held[stroke[1]]
+
+        chordKeys = {}
+        for msg in keyPlanner.planChord(list(noteOns), pianoMap, allow88):
+            notes += 1
+            stroke = strokeFor(msg.note)
+            if stroke is None:
+                unplayable += 1
+                continue
+            strokeModifier, key = stroke
+            if key in chordKeys:
+                if chordKeys[key] != msg.note:
+                    collisions += 1
+                continue
+            chordKeys[key] = msg.note
+            if key in held and (held[key] != msg.note or not noDoubles):
+                drops += 1
+            held[key] = msg.note
+            setModifier(strokeModifier)
+            peakKeys = max(peakKeys, len(held) + (modifier is not None))
+        setModifier(None)
+
+    clean = notes - collisions - drops - unplayable
+    return {
+        "notes": notes,
+        "collisions": collisions,
+        "noDoublesDrops": drops,
+        "unplayable": unplayable,
+        "modifierToggles": toggles,
+        "togglesPerSecond": round(toggles / song.length, 3) if song.length else 0.0,
+        "peakKeys": peakKeys,
+        "cleanRatio": round(clean / notes, 4) if notes else 1.0,
+    }
+
+
+def analyzeFile(path: str, pianoMap, allow88: bool, noDoubles: bool = True) -> dict:
+    return analyzeTimeline(compileTimeline(path), pianoMap, allow88, noDoubles)
+
+
+def analyzePath(path: str, pianoMap, allow88: bool, noDoubles: bool = True):
+    """(path, result), or (path, None) when the file can't be analyzed."""
+    try:
+        return path, analyzeFile(path, pianoMap, allow88, noDoubles)
+    except Exception as e:
+        logger.debug(f"playability of {path} failed: {e}")
+        return path, None
+
+
+def summary(result: dict) -> str:
+    return (
+        f"{result['cleanRatio'] * 100:.0f}% clean, "
+        f"{result['collisions']} collisions, {result['noDoublesDrops']} noDoubles drops, "
+        f"{result['togglesPerSecond']:.1f} modifier toggles/s, peak {result['peakKeys']} keys"
+    )
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class PlaybackGate:
+    """
+    Pause / stop signalling shared by a playback loop and its clock.
+
+    Instead of polling `paused` every few milliseconds, the scheduler
+    blocks on a Condition until its next deadline. pausePlayback and
+    stopPlayback notify it, so resume and stop take effect immediately
+    and a paused song uses no CPU.
+    """
+
+    def __init__(self, stopEvent: threading.Event):
+        self.stopEvent = stopEvent
+        self.condition = threading.Condition()
+        self.paused = False
+
+    def setPaused(self, paused: bool):
+        with self.condition:
+            self.paused = paused
+            self.condition.notify_all()
+
+    def wake(self):
+        """Wake every waiter so it re-checks stopEvent (call after setting it)."""
+        with self.condition:
+            self.condition.notify_all()
+
+    def waitWhilePaused(self) -> float:
+        """Block while paused. Returns how long the call blocked, in seconds."""
+        start = time.monotonic()
+        with self.condition:
+            while self.paused and not self.stopEvent.is_set():
+                self.condition.wait()
+        return time.monotonic() - start
+
+    def sleepUntil(self, deadline: float) -> bool:
+        """
+        Sleep until the time.monotonic() deadline.
+
+        Returns True once the deadline is reached, or False straight
+        away if playback gets paused or stopped in the meantime.
+        """
+        with self.condition:
+            while True:
+                if self.paused or self.stopEvent.is_set():
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self.condition.wait(remaining)
@@ -0,0 +1,184 @@
+import gc
+import os
+import platform
+import logging
+import threading
+import contextlib
+
+from modules import configuration
+
+logger = logging.getLogger(__name__)
+osName = platform.system()
+
+# ============================================================
+# PERFORMANCE MODE (opt-in)
+# ============================================================
+# config: midiPlayer.performanceMode
+#   enabled           master switch
+#   realtimePriority  SCHED_FIFO priority (1-99) for the playback thread;
+#                     falls back to a lower nice value when not permitted
+#   cpuCore           core to pin the playback thread to (-1 = don't pin)
+#   disableGC         keep the cyclic GC off while a song is playing
+#   freezeHeap        move the heap to the permanent generation at play start
+#
+# Everything here only touches the calling thread, so call it from
+# inside the playback thread.
+
+
+def _options():
+    opts = configuration.configData["midiPlayer"].get("performanceMode") or {}
+    return opts if opts.get("enabled") else None
+
+
+def _raisePriorityPosix(priority: int) -> str:
+    if hasattr(os, "sched_setscheduler"):
+        try:
+            priority = max(1, min(99, int(priority)))
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            return f"SCHED_FIFO {priority}"
+        except (PermissionError, OSError) as e:
+            logger.debug(f"SCHED_FIFO not permitted: {e}")
+
+    # per-thread nice on Linux (tid), whole process elsewhere
+    target = threading.get_native_id() if osName == "Linux" else 0
+    for niceness in (-10, -5, -1):
+        try:
+            os.setpriority(os.PRIO_PROCESS, target, niceness)
+            return f"nice {niceness}"
+        except (PermissionError, OSError):
+            continue
+    return "priority unchanged (not permitted)"
+
+
+def _raisePriorityWindows() -> str:
+    import ctypes
+    THREAD_PRIORITY_TIME_CRITICAL = 15
+    kernel32 = ctypes.windll.kernel32
+    if kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL):
+        return "time-critical priority"
+    return "priority unchanged (not permitted)"
+
+
+def _pinToCore(core: int) -> str:
+    if osName == "Windows":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), 1 << core):
+            return f"core {core}"
+        return f"core {core} rejected"
+
+    if not hasattr(os, "sched_setaffinity"):
+        return "pinning unsupported"
+    try:
+        if core not in os.sched_getaffinity(0):
+            return f"core {core} unavailable"
+        os.sched_setaffinity(0, {core})
+        return f"core {core}"
+    except OSError as e:
+        logger.debug(f"sched_setaffinity failed: {e}")
+        return f"core {core} rejected"
+
+
+def tunePlaybackThread():
+    """
+    Apply performance mode to the calling (playback) thread.
+
+    Returns a short description for the console, or None when
+    performance mode is off.
+    """
+    opts = _options()
+    if not opts:
+        return None
+
+    applied = []
+    try:
+        if osName == "Windows":
+            applied.append(_raisePriorityWindows())
+        else:
+            applied.append(_raisePriorityPosix(opts.get("realtimePriority", 10)))
+
+        core = int(opts.get("cpuCore", -1))
+        if core >= 0:
+            applied.append(_pinToCore(core))
+    except Exception as e:
+        logger.warning(f"performance mode could not be applied: {e}")
+
+    if opts.get("disableGC", True):
+        applied.append("GC off while playing")
+    if opts.get("freezeHeap", True) and hasattr(gc, "freeze"):
+        applied.append("heap frozen")
+
+    summary = ", ".join(applied)
+    logger.info(f"performance mode: {summary}")
+    return summary
+
+
+# The GC switch is process-wide too, so pauses are counted like the
+# freezes below: the first song in turns it off, the last one out turns
+# it back on (unless it was already off before any song started).
+
+_pauseLock = threading.Lock()
+_pauseDepth = 0
+_pauseRestore = False
+
+
+@contextlib.contextmanager
+def gcPaused():
+    """Keep the cyclic GC off for the duration of a song when performance mode asks for it."""
+    global _pauseDepth, _pauseRestore
+    opts = _options()
+    if not opts or not opts.get("disableGC", True):
+        yield
+        return
+
+    with _pauseLock:
+        if _pauseDepth == 0:
+            _pauseRestore = gc.isenabled()
+            gc.disable()
+        _pauseDepth += 1
+    try:
+        yield
+    finally:
+        with _pauseLock:
+            _pauseDepth -= 1
+            if _pauseDepth == 0 and _pauseRestore:
+                gc.enable()
+
+
+# ============================================================
+# FROZEN HEAP (performance mode)
+# ============================================================
+# Everything alive when a song starts (the UI, the compiled timeline)
+# is moved to the permanent generation, so a collection that does run
+# during playback only scans what was allocated since. Freezing costs
+# a full collection first, so it is opt-in like gcPaused.
+#
+# gc.freeze() is process-wide and engines can overlap (drums and piano,
+# or a stop racing the next start), so freezes are counted and only
+# the last one out unfreezes.
+
+_freezeLock = threading.Lock()
+_freezeDepth = 0
+
+
+@contextlib.contextmanager
+def gcFrozen():
+    """Freeze the current heap for the duration of playback when performance mode asks for it."""
+    global _freezeDepth
+    opts = _options()
+    if not opts or not opts.get("freezeHeap", True) or not hasattr(gc, "freeze"):
+        yield
+        return
+
+    with _freezeLock:
+        if _freezeDepth == 0:
+            gc.collect()
+            gc.freeze()
+        _freezeDepth += 1
+    try:
+        yield
+    finally:
+        with _freezeLock:
+            _freezeDepth -= 1
+            if _freezeDepth == 0:
+                gc.unfreeze()
@@ -0,0 +1,79 @@
+import mido
+
+# ============================================================
+# COMPILED TIMELINE
+# ============================================================
+# Iterating a mido.MidiFile merges the tracks and copies every message
+# on every pass. The engines instead compile a song once into blocks of
+# messages that share a timestamp, and the play loop only walks these
+# prebuilt lists, so it allocates next to nothing while a song plays
+# (including when it loops).
+
+
+class Timeline:
+    """
+    A song as same-timestamp blocks.
+
+    delays[i]   seconds between block i-1 and block i
+    blocks[i]   the block's messages in file order (meta messages dropped)
+    others[i]   everything in the block that is not a sounding note_on
+    noteOns[i]  the block's note_on messages with velocity > 0; the
+                humanizer shuffles this list in place
+    length      song length in seconds (same as MidiFile.length)
+    """
+
+    __slots__ = ("delays", "blocks", "others", "noteOns", "length")
+
+    def __init__(self):
+        self.delays = []
+        self.blocks = []
+        self.others = []
+        self.noteOns = []
+        self.length = 0.0
+
+    def __len__(self):
+        return len(self.blocks)
+
+
+def isNoteOn(msg) -> bool:
+    return msg.type == "note_on" and msg.velocity > 0
+
+
+def compileTimeline(midiFile, transpose: int = 0) -> Timeline:
+    """
+    Parse a MIDI file (path or mido.MidiFile) into a Timeline, shifting
+    every note by transpose semitones (clamped to 0-127).
+    """
+    mid = midiFile if isinstance(midiFile, mido.MidiFile) else mido.MidiFile(midiFile, clip=True)
+    song = Timeline()
+
+    block = None
+    delay = 0.0
+    for msg in mid:
+        if msg.time:
+            delay += msg.time
+            song.length += msg.time
+            block = None
+        if msg.is_meta:
+            continue
+        if transpose and msg.type in ("note_on", "note_off"):
+            # iterating a MidiFile yields copies, so this never touches mid
+            msg.note = max(0, min(127, msg.note + transpose))
+        if block is None:
+            block = []
+            song.delays.append(delay)
+            song.blocks.append(block)
+            delay = 0.0
+        block.append(msg)
+
+    # trailing meta events (end_of_track) still take time
+    if delay > 0:
+        song.delays.append(delay)
+        song.blocks.append([])
+
+    for i, block in enumerate(song.blocks):
+        song.blocks[i] = tuple(block)
+        song.others.append(tuple(m for m in block if not isNoteOn(m)))
+        song.noteOns.append([m for m in block if isNoteOn(m)])
+
+    return song
@@ -5,10 +5,15 @@ import random
 
 from modules.functions import mainFunctions
 from modules import configuration
+from modules.midiHandler import latencyStats
+from modules.midiHandler.playbackGate import PlaybackGate
+from modules.midiHandler import threadTuning
+from modules.midiHandler import timeline
 
 activeTransposedNotes = {}
 activeNotes = set()
 stopEvent = threading.Event()
+gate = PlaybackGate(stopEvent)
 clockThreadRef = None
 timerList = []
 closeThread = False
@@ -16,6 +21,10 @@ paused = False
 playThread = None
 playbackSpeed = 1.0
 sustainActive = False
+songPosition = 0.0
+finishedCallback = None
+latency = latencyStats.LatencySession()
+transposeSemitones = 0
 midiOut = None
 
 log = mainFunctions.log
@@ -78,99 +87,117 @@ def parseMidi(message):
             activeNotes.remove(key)
 
         if midiOut:
-            midiOut.send(message)
+            latency.timed(midiOut.send, message)
 
 def playMidiOnce(midiFile):
-    global sustainActive
-    mid = mido.MidiFile(midiFile, clip=True)
+    global sustainActive, songPosition
+    song = midiFile if isinstance(midiFile, timeline.Timeline) else timeline.compileTimeline(midiFile)
+    songPosition = 0.0
     startTime = time.monotonic()
     currentTime = 0
-    for msg in mid:
+    for delay, block in zip(song.delays, song.blocks):
         if stopEvent.is_set() or closeThread:
             return False
 
-        adjustedDelay = msg.time / playbackSpeed
-        if configuration.configData["midiPlayer"]["randomFail"]["enabled"] and not msg.is_meta:
+        adjustedDelay = delay / playbackSpeed
+        if configuration.configData["midiPlayer"]["randomFail"]["enabled"]:
             if random.random() < configuration.configData["midiPlayer"]["randomFail"]["speed"] / 100:
                 adjustedDelay *= random.uniform(0.5, 1.5)
 
         currentTime += adjustedDelay
         targetTime = startTime + currentTime
 
-        while time.monotonic() < targetTime:
+        while True:
             if stopEvent.is_set() or closeThread:
                 return False
-            while paused and not (stopEvent.is_set() or closeThread):
-                pauseStart = time.monotonic()
-                time.sleep(0.05)
-                delta = time.monotonic() - pauseStart
-                startTime += delta
-                targetTime += delta
-            remaining = targetTime - time.monotonic()
-            if remaining > 0:
-                time.sleep(min(remaining, 0.005))
-
-        if msg.is_meta:
-            continue
-
-        if hasattr(msg, "note"):
-            n = msg.note
-
-            if not noteAllowed(n):
-                log(f"out of range: {n}")
+            if paused:
+                pauseDuration = gate.waitWhilePaused()
+                startTime += pauseDuration
+                targetTime += pauseDuration
                 continue
+            # wakes early on pause/stop, otherwise returns at targetTime
+            if gate.sleepUntil(targetTime):
+                break
 
-            if msg.type == "note_on" and msg.velocity > 0:
-                if configuration.configData["midiPlayer"]["randomFail"]["enabled"]:
-                    if random.random() < configuration.configData["midiPlayer"]["randomFail"]["transpose"] / 100:
-                        delta = random.randint(-12, 12)
-                        newNote = n + delta
-                        if not noteAllowed(newNote):
-                            log(f"out of range: {newNote}")
-                            continue
-                        if n not in activeTransposedNotes:
-                            activeTransposedNotes[n] = []
-                        activeTransposedNotes[n].append(newNote)
-                        original = msg.note
-                        msg.note = newNote
-                        parseMidi(msg)
-                        msg.note = original
-                        continue
+        songPosition += delay
+
+        if latency.enabled:
+            latency.due(targetTime)
+
+        for msg in block:
+            if hasattr(msg, "note"):
+                n = msg.note
 
-            if msg.type == "note_off" or (msg.type == "note_on" and msg.velocity == 0):
-                if n in activeTransposedNotes and activeTransposedNotes[n]:
-                    transNote = activeTransposedNotes[n].pop(0)
-                    if not activeTransposedNotes[n]:
-                        del activeTransposedNotes[n]
-                    if noteAllowed(transNote):
-                        original = msg.note
-                        msg.note = transNote
-                        parseMidi(msg)
-                        msg.note = original
-                    else:
-                        log(f"out of range: {transNote}")
+                if not noteAllowed(n):
+                    log(f"out of range: {n}")
                     continue
 
-        parseMidi(msg)
+                if msg.type == "note_on" and msg.velocity > 0:
+                    if configuration.configData["midiPlayer"]["randomFail"]["enabled"]:
+                        if random.random() < configuration.configData["midiPlayer"]["randomFail"]["transpose"] / 100:
+                            delta = random.randint(-12, 12)
+                            newNote = n + delta
+                            if not noteAllowed(newNote):
+                                log(f"out of range: {newNote}")
+                                continue
+                            if n not in activeTransposedNotes:
+                                activeTransposedNotes[n] = []
+                            activeTransposedNotes[n].append(newNote)
+                            original = msg.note
+                            msg.note = newNote
+                            parseMidi(msg)
+                            msg.note = original
+                            continue
+
+                if msg.type == "note_off" or (msg.type == "note_on" and msg.velocity == 0):
+                    if n in activeTransposedNotes and activeTransposedNotes[n]:
+                        transNote = activeTransposedNotes[n].pop(0)
+                        if not activeTransposedNotes[n]:
+                            del activeTransposedNotes[n]
+                        if noteAllowed(transNote):
+                            original = msg.note
+                            msg.note = transNote
+                            parseMidi(msg)
+                            msg.note = original
+                        else:
+                            log(f"out of range: {transNote}")
+                        continue
+
+            parseMidi(msg)
 
     return True
 
-def playMidiFile(midiFile):
+def playMidiFile(midiFile, song=None):
     log("nanoMIDI Direct MIDI Out v1.0")
     log(f"Playing MIDI file: {midiFile}")
 
-    while not (stopEvent.is_set() or closeThread):
-        finished = playMidiOnce(midiFile)
+    tuning = threadTuning.tunePlaybackThread()
+    if tuning:
+        log(f"Performance mode: {tuning}")
 
-        if stopEvent.is_set() or closeThread:
-            break
+    if song is None:
+        song = timeline.compileTimeline(midiFile)
+
+    with threadTuning.gcFrozen():
+        while not (stopEvent.is_set() or closeThread):
+            with threadTuning.gcPaused():
+                finished = playMidiOnce(song)
+
+            if stopEvent.is_set() or closeThread:
+                break
+
+            if not finished:
+                break
 
-        if not finished:
-            break
+            if not configuration.configData["midiPlayer"]["loopSong"]:
+                if finishedCallback:
+                    finishedCallback()
+                else:
+                    from modules.functions.midiPlayerFunctions import stopPlayback
+                    stopPlayback()
+                break
 
-        if not configuration.configData["midiPlayer"]["loopSong"]:
-            from modules.functions.midiPlayerFunctions import stopPlayback
-            stopPlayback()
+    latency.writeReport("midiOut", midiFile)
 
 def formatTime(seconds):
     hours = int(seconds // 3600)
@@ -190,30 +217,35 @@ def clockThread(totalSeconds, updateCallback=None):
             else:
                 log(formattedTime)
             currentSeconds += 1
-            for _ in range(10):
+            deadline = time.monotonic() + 1.0 / max(0.1, playbackSpeed)
+            while not gate.sleepUntil(deadline):
                 if stopEvent.is_set() or closeThread:
-                    break
-                time.sleep(0.1 / playbackSpeed)
+                    return
+                deadline += gate.waitWhilePaused()
         else:
-            time.sleep(0.1)
+            gate.waitWhilePaused()
 
-def startPlayback(midiFile, outputDevice, updateCallback=None):
-    global playThread, stopEvent, clockThreadRef, closeThread, paused, midiOut
+def startPlayback(midiFile, outputDevice, updateCallback=None, onFinished=None):
+    global playThread, stopEvent, clockThreadRef, closeThread, paused, midiOut, finishedCallback, latency
     stopEvent.clear()
     closeThread = False
     paused = False
+    gate.setPaused(False)
     if playThread is not None and isinstance(playThread, threading.Thread) and playThread.is_alive():
         return
     midiOut = mido.open_output(outputDevice)
-    totalSeconds = mido.MidiFile(midiFile, clip=True).length
-    playThread = threading.Thread(target=playMidiFile, args=(midiFile,), daemon=True)
-    clockThreadRef = threading.Thread(target=clockThread, args=(totalSeconds, updateCallback), daemon=True)
+    finishedCallback = onFinished
+    song = timeline.compileTimeline(midiFile, transposeSemitones)
+    latency = latencyStats.begin()
+    playThread = threading.Thread(target=playMidiFile, args=(midiFile, song), daemon=True)
+    clockThreadRef = threading.Thread(target=clockThread, args=(song.length, updateCallback), daemon=True)
     clockThreadRef.start()
     playThread.start()
 
 def pausePlayback():
     global paused, sustainActive
     paused = not paused
+    gate.setPaused(paused)
     
     if paused and configuration.configData["midiPlayer"]["releaseOnPause"]:
         if midiOut:
@@ -241,6 +273,7 @@ def stopPlayback():
     if stopEvent.is_set():
         return
     stopEvent.set()
+    gate.wake()
     closeThread = True
     for t in list(timerList):
         try:
@@ -0,0 +1,398 @@
+import os
+import sys
+import atexit
+import struct
+import logging
+import platform
+import threading
+import contextlib
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+
+logger = logging.getLogger(__name__)
+osName = platform.system()
+
+# ============================================================
+# PROCESS-ISOLATED PLAYBACK (opt-in: midiPlayer.workerProcess)
+# ============================================================
+# The engine runs in its own process so CustomTkinter redraws, hub
+# image decoding and requests calls never hold the GIL the playback
+# thread needs. The UI talks to it through:
+#   - a ControlBlock in shared memory: state, speed, position
+#   - a duplex Pipe for commands (UI → worker) and events (worker → UI)
+# A crashed worker is noticed when its pipe closes and is started
+# again on the next play.
+
+IDLE, PLAYING, PAUSED, FINISHED = range(4)
+STATE_NAMES = ("idle", "playing", "paused", "finished")
+
+# the worker must not fetch remote defaults or write config.json
+WORKER_ENV = {"NANOMIDI_OFFLINE": "1", "NANOMIDI_CONFIG_READONLY": "1"}
+HOUSEKEEPING_INTERVAL = 0.05
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Map an existing block without telling the resource tracker about it.
+
+    Only the UI owns the block. Before 3.13, SharedMemory(name=...)
+    registers it anyway, so a tracker of the worker's own would unlink it
+    (with a leak warning) when the worker exits. The spawned worker
+    shares the UI's tracker, so unregistering afterwards would drop the
+    UI's own entry as well. Neither registration may happen.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None  # the worker attaches before it starts any threads
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class ControlBlock:
+    """
+    Fixed-layout block both processes map.
+
+    offset 0   int32    state     written by the worker
+    offset 8   float64  speed     written by the UI (1.0 = 100%)
+    offset 16  float64  position  written by the worker, seconds into the song
+    """
+
+    SIZE = 24
+    _INT = struct.Struct("<i")
+    _DOUBLE = struct.Struct("<d")
+
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.SIZE)
+            self.shm.buf[:self.SIZE] = bytes(self.SIZE)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.name = self.shm.name
+
+    @property
+    def state(self) -> int:
+        return self._INT.unpack_from(self.shm.buf, 0)[0]
+
+    @state.setter
+    def state(self, value: int):
+        self._INT.pack_into(self.shm.buf, 0, value)
+
+    @property
+    def speed(self) -> float:
+        return self._DOUBLE.unpack_from(self.shm.buf, 8)[0]
+
+    @speed.setter
+    def speed(self, value: float):
+        self._DOUBLE.pack_into(self.shm.buf, 8, value)
+
+    @property
+    def position(self) -> float:
+        return self._DOUBLE.unpack_from(self.shm.buf, 16)[0]
+
+    @position.setter
+    def position(self, value: float):
+        self._DOUBLE.pack_into(self.shm.buf, 16, value)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ------------------------
+# WORKER PROCESS
+# ------------------------
+
+def _importEngine(useMIDIOutput: bool):
+    if useMIDIOutput:
+        from modules.midiHandler import useOutput as engine
+    elif osName == "Windows":
+        from modules.midiHandler import midiWindows as engine
+    elif osName == "Darwin":
+        from modules.midiHandler import midiDarwin as engine
+    else:
+        from modules.midiHandler import midiLinux as engine
+    return engine
+
+
+def _workerMain(blockName: str, conn):
+    block = ControlBlock(blockName)
+    sendLock = threading.Lock()
+
+    def send(*message):
+        with sendLock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass  # UI is gone, the main loop exits on its own
+
+    from modules import configuration
+
+    engines = {}
+    engine = None
+    generation = 0            # of the play command being served
+
+    def engineFor(useMIDIOutput: bool):
+        if useMIDIOutput not in engines:
+            loaded = _importEngine(useMIDIOutput)
+            loaded.log = lambda text: send("log", str(text))
+            engines[useMIDIOutput] = loaded
+        return engines[useMIDIOutput]
+
+    def stopEngine():
+        if engine is not None:
+            try:
+                engine.stopPlayback()
+            except Exception as e:
+                send("log", f"stop failed: {e}")
+
+    def finishedFor(playGeneration: int, playEngine):
+        def onFinished():
+            # runs on the engine's play thread whenever a non-looping song
+            # ends, stopped or not; only a natural end of the current song
+            # is reported, so a late one can't stop the next song
+            if playGeneration != generation or playEngine.stopEvent.is_set():
+                return
+            stopEngine()
+            block.state = FINISHED
+            send("finished", playGeneration)
+        return onFinished
+
+    try:
+        while True:
+            if conn.poll(HOUSEKEEPING_INTERVAL):
+                try:
+                    command, args = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                if command == "quit":
+                    break
+
+                if command == "play":
+                    stopEngine()
+                    configuration.configData.loadData(args["config"])
+                    engine = engineFor(args["outputDevice"] is not None)
+                    generation = args["generation"]
+                    onFinished = finishedFor(generation, engine)
+                    engine.playbackSpeed = block.speed
+                    engine.songPosition = 0.0
+                    block.position = 0.0
+                    updateTimeline = lambda text: send("timeline", text)
+                    try:
+                        if args["outputDevice"] is not None:
+                            engine.startPlayback(args["midiFile"], args["outputDevice"], updateCallback=updateTimeline, onFinished=onFinished)
+                        else:
+                            engine.startPlayback(args["midiFile"], updateCallback=updateTimeline, onFinished=onFinished)
+                        block.state = PLAYING
+                    except Exception as e:
+                        block.state = IDLE
+                        send("error", f"{type(e).__name__}: {e}", generation)
+
+                elif command == "pause":
+                    if engine is not None and engine.paused != args:
+                        engine.pausePlayback()
+
+                elif command == "stop":
+                    stopEngine()
+                    block.state = IDLE
+
+            if engine is not None:
+                engine.playbackSpeed = block.speed
+                block.position = engine.songPosition
+                if block.state in (PLAYING, PAUSED) and not engine.stopEvent.is_set():
+                    block.state = PAUSED if engine.paused else PLAYING
+    finally:
+        stopEngine()
+        block.close()
+        conn.close()
+
+
+@contextlib.contextmanager
+def _childEnvironment():
+    """Expose WORKER_ENV to the process being spawned without keeping it in ours."""
+    previous = {key: os.environ.get(key) for key in WORKER_ENV}
+    os.environ.update(WORKER_ENV)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+# ------------------------
+# UI SIDE
+# ------------------------
+
+class PlaybackWorker:
+    """
+    Handle the UI keeps on the worker process.
+
+    onLog(text)  console lines from the engine
+    onFinished() the song ended or the worker died; called off the Tk thread
+
+    Every play gets a new generation; "finished" and "error" events from
+    an older play are dropped, as the UI has moved on from that song.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.block = None
+        self.onLog = None
+        self.onFinished = None
+        self.updateCallback = None
+        self._closing = False
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._sendLock = threading.Lock()   # IPC and Tk threads both send commands
+
+    def isAlive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.isAlive():
+                return
+            self._release()
+
+            ctx = multiprocessing.get_context("spawn")
+            self.block = ControlBlock()
+            self.block.speed = 1.0
+            parentConn, childConn = ctx.Pipe(duplex=True)
+            process = ctx.Process(
+                target=_workerMain,
+                args=(self.block.name, childConn),
+                name="nanoMIDI-playback",
+                daemon=True,
+            )
+            with _childEnvironment():
+                process.start()
+            childConn.close()
+
+            self.process = process
+            self.conn = parentConn
+            self._closing = False
+            threading.Thread(target=self._listen, args=(parentConn, process), daemon=True).start()
+            logger.info(f"playback worker started (pid {process.pid})")
+
+    def _listen(self, conn, process):
+        while True:
+            try:
+                kind, *payload = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if kind == "log" and self.onLog:
+                self.onLog(payload[0])
+            elif kind == "timeline" and self.updateCallback:
+                self.updateCallback(payload[0])
+            elif kind in ("finished", "error") and payload[-1] != self.generation:
+                logger.debug(f"dropping stale {kind} from play {payload[-1]}")
+            elif kind == "finished" and self.onFinished:
+                self.onFinished()
+            elif kind == "error":
+                logger.error(f"playback worker: {payload[0]}")
+                if self.onLog:
+                    self.onLog(f"Playback failed: {payload[0]}")
+                if self.onFinished:
+                    self.onFinished()
+
+        process.join(timeout=1.0)
+        if process is self.process and not self._closing:
+            logger.warning(f"playback worker exited unexpectedly (exit code {process.exitcode})")
+            if self.onLog:
+                self.onLog("Playback worker stopped unexpectedly; it restarts on the next play.")
+            if self.onFinished:
+                self.onFinished()
+
+    def _send(self, command: str, args=None) -> bool:
+        if self.conn is None:
+            return False
+        try:
+            with self._sendLock:
+                self.conn.send((command, args))
+            return True
+        except (OSError, EOFError) as e:
+            logger.warning(f"playback worker unreachable: {e}")
+            return False
+
+    # --- commands ---
+    def play(self, midiFile: str, outputDevice=None, speed: float = 1.0, updateCallback=None):
+        from modules import configuration
+
+        self.start()
+        self.updateCallback = updateCallback
+        self.block.speed = speed
+        self.generation += 1
+        self._send("play", {
+            "generation": self.generation,
+            "midiFile": midiFile,
+            "outputDevice": outputDevice,
+            "config": configuration.configData.to_dict(),
+        })
+
+    def pause(self, paused: bool):
+        self._send("pause", paused)
+
+    def stop(self):
+        if self.isAlive():
+            self._send("stop")
+
+    def setSpeed(self, speed: float):
+        if self.block is not None:
+            self.block.speed = max(0.1, min(5.0, speed))
+
+    def changeSpeed(self, amount: float) -> float:
+        self.setSpeed(self.speed + amount)
+        return self.speed
+
+    # --- shared state ---
+    @property
+    def speed(self) -> float:
+        return self.block.speed if self.block is not None else 1.0
+
+    @property
+    def position(self) -> float:
+        return self.block.position if self.block is not None else 0.0
+
+    @property
+    def state(self) -> str:
+        if not self.isAlive():
+            return "stopped"
+        return STATE_NAMES[self.block.state]
+
+    def shutdown(self):
+        with self._lock:
+            self._closing = True
+            if self.isAlive():
+                self._send("quit")
+                self.process.join(timeout=2.0)
+                if self.process.is_alive():
+                    self.process.terminate()
+            self._release()
+
+    def _release(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.block is not None:
+            self.block.close()
+            self.block = None
+        self.process = None
+
+
+worker = PlaybackWorker()
+atexit.register(worker.shutdown)
@@ -11,6 +11,7 @@ class PlaybackState:
         self.stop_event = None
         self.play_thread = None
         self.clock_thread = None
+        self.use_worker = False  # this song runs in the playback worker process
 
         # midi state
         self.sustain_active = False
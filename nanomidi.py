@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Headless nanoMIDIPlayer: play a MIDI file through the same engines as the app.
+
+Usage:
+  python nanomidi.py play song.mid
+  python nanomidi.py play song.mid --speed 1.25 --loop --transpose -2 --no-humanize
+  python nanomidi.py play song.mid --engine midiout --output "IAC Driver Bus 1"
+  python nanomidi.py play drums.mid --engine drums
+  python nanomidi.py outputs
+
+No window is created, so it works over SSH or from a compositor
+autostart. Settings come from config.json; the flags only override
+them for this run and nothing is written back.
+"""
+
+import os
+import sys
+import signal
+import argparse
+import platform
+import threading
+
+# set before anything imports modules.configuration
+os.environ.setdefault("NANOMIDI_OFFLINE", "1")
+os.environ.setdefault("NANOMIDI_CONFIG_READONLY", "1")
+
+osName = platform.system()
+ENGINES = ("keys", "midiout", "drums")
+
+
+def loadEngine(name: str):
+    if name == "midiout":
+        from modules.midiHandler import useOutput as engine
+    elif name == "drums":
+        if osName == "Windows":
+            from modules.midiHandler import drumsWindows as engine
+        elif osName == "Darwin":
+            from modules.midiHandler import drumsDarwin as engine
+        else:
+            from modules.midiHandler import drumsLinux as engine
+    elif osName == "Windows":
+        from modules.midiHandler import midiWindows as engine
+    elif osName == "Darwin":
+        from modules.midiHandler import midiDarwin as engine
+    else:
+        from modules.midiHandler import midiLinux as engine
+    return engine
+
+
+def listOutputs() -> int:
+    import mido
+    try:
+        names = mido.get_output_names()
+    except Exception as e:
+        print(f"nanomidi: can't list MIDI outputs: {e}", file=sys.stderr)
+        return 1
+    for name in names:
+        print(name)
+    return 0
+
+
+def play(args) -> int:
+    if not os.path.isfile(args.file):
+        print(f"nanomidi: no such file: {args.file}", file=sys.stderr)
+        return 2
+    if args.engine == "drums" and args.transpose:
+        print("nanomidi: --transpose does not apply to the drums engine", file=sys.stderr)
+        return 2
+
+    from modules import configuration
+
+    section = "drumsMacro" if args.engine == "drums" else "midiPlayer"
+    configuration.configData[section]["loopSong"] = args.loop
+
+    engine = loadEngine(args.engine)
+    if args.no_humanize and not hasattr(engine, "humanizeChords"):
+        # only the Linux keys engine rolls chords; the others already press them together
+        print("nanomidi: --no-humanize only applies to --engine keys on Linux", file=sys.stderr)
+        return 2
+    engine.log = (lambda text: None) if args.quiet else (lambda text: print(text, file=sys.stderr, flush=True))
+    engine.playbackSpeed = max(0.1, min(5.0, args.speed))
+    if args.engine != "drums":
+        engine.transposeSemitones = args.transpose
+    if args.no_humanize:
+        engine.humanizeChords = False
+
+    def showTime(text):
+        if not args.quiet:
+            print(f"\r{text}", end="", file=sys.stderr, flush=True)
+
+    finished = threading.Event()
+    try:
+        if args.engine == "midiout":
+            import mido
+            outputs = mido.get_output_names() if not args.output else []
+            outputDevice = args.output or (outputs[0] if outputs else None)
+            if outputDevice is None:
+                print("nanomidi: no MIDI output found (see `nanomidi outputs`)", file=sys.stderr)
+                return 1
+            engine.startPlayback(args.file, outputDevice, updateCallback=showTime, onFinished=finished.set)
+        else:
+            engine.startPlayback(args.file, updateCallback=showTime, onFinished=finished.set)
+    except Exception as e:
+        print(f"nanomidi: can't start playback: {e}", file=sys.stderr)
+        return 1
+
+    # SIGTERM (systemd, compositor shutdown) stops like Ctrl+C
+    interrupted = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: interrupted.set())
+    crashed = False
+    try:
+        while not (finished.wait(0.2) or interrupted.is_set()):
+            if engine.playThread is None or not engine.playThread.is_alive():
+                # the engine calls onFinished on its way out, unless it died
+                crashed = not finished.is_set()
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stopPlayback()
+        if not args.quiet:
+            print(file=sys.stderr)
+    if crashed:
+        print("nanomidi: playback stopped unexpectedly", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="nanomidi", description="Headless nanoMIDIPlayer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    playParser = commands.add_parser("play", help="play a MIDI file")
+    playParser.add_argument("file", help="path to a .mid / .midi file")
+    playParser.add_argument("--engine", choices=ENGINES, default="keys",
+                            help="keys: virtual keyboard (default), midiout: MIDI output port, drums: drums macro")
+    playParser.add_argument("--output", help="MIDI output port for --engine midiout (default: the first one)")
+    playParser.add_argument("--speed", type=float, default=1.0, help="playback speed, 1.0 = 100%% (0.1 - 5.0)")
+    playParser.add_argument("--loop", action="store_true", help="repeat until interrupted")
+    playParser.add_argument("--transpose", type=int, default=0, help="shift every note by this many semitones")
+    playParser.add_argument("--no-humanize", action="store_true", help="press chord notes together instead of rolling them (--engine keys on Linux)")
+    playParser.add_argument("-q", "--quiet", action="store_true", help="no engine log or clock on stderr")
+
+    commands.add_parser("outputs", help="list MIDI output ports")
+
+    args = parser.parse_args(argv)
+    if args.command == "outputs":
+        return listOutputs()
+    return play(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Send an IPC command to a running nanoMIDIPlayer instance.
+"""Send an IPC command to a running nanoMIDIPlayer instance and print the reply.
 
 Usage:
   python scripts/nanomidi_cmd.py play
@@ -7,49 +7,119 @@ Usage:
   python scripts/nanomidi_cmd.py stop
   python scripts/nanomidi_cmd.py slow_down
   python scripts/nanomidi_cmd.py speed_up
+  python scripts/nanomidi_cmd.py speed 120
   python scripts/nanomidi_cmd.py tab:0
+  python scripts/nanomidi_cmd.py status        (also: state, position, speed, file)
+  python scripts/nanomidi_cmd.py subscribe     (also: subscribe state, subscribe position)
+
+Exits 0 when the app confirmed the command, 1 otherwise. Add --json to
+print the raw reply. subscribe prints one JSON event per line until
+interrupted, e.g. for a status bar module.
 
 You typically bind this in Hyprland, e.g.:
   bind = ,F1,exec,python ...
 """
 
 import os
+import json
 import socket
 import sys
 
+TIMEOUT = 5.0
+
+
 def socket_path() -> str:
+    # same lookup as modules.functions.ipcFunctions.get_default_socket_path
     base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        return os.path.join(base, "nanomidiplayer.sock")
+    return os.path.join(os.path.expanduser("~"), ".cache", "nanoMIDIPlayer", "nanomidiplayer.sock")
+
+
+def build_request(words) -> dict:
+    cmd = words[0].lower()
+    args = {}
+    if cmd.startswith("tab:"):
+        cmd, args = "tab", {"index": cmd.split(":", 1)[1]}
+    elif cmd == "tab" and len(words) > 1:
+        args = {"index": words[1]}
+    elif cmd == "speed" and len(words) > 1:
+        args = {"value": words[1]}
+    elif cmd == "subscribe" and len(words) > 1:
+        args = {"events": [w.lower() for w in words[1:]]}
+    return {"id": 1, "cmd": cmd, "args": args}
+
+
+def request(payload: dict, path: str) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(TIMEOUT)
+        s.connect(path)
+        s.sendall((json.dumps(payload) + "\n").encode("utf-8"))
 
-    if not base:
-        # fallback if somehow missing (rare on Wayland)
-        base = f"/run/user/{os.getuid()}"
+        buffer = b""
+        while b"\n" not in buffer:
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            buffer += chunk
+    if not buffer.strip():
+        raise ConnectionError("no reply (is this an older nanoMIDIPlayer?)")
+    return json.loads(buffer.split(b"\n", 1)[0])
+
+
+def subscribe(payload: dict, path: str) -> int:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(TIMEOUT)
+        s.connect(path)
+        s.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        s.settimeout(None)  # events only arrive while something changes
+
+        reader = s.makefile("rb")
+        reply = json.loads(reader.readline() or b"{}")
+        if not reply.get("ok"):
+            error = reply.get("error") or {}
+            print(f"{error.get('code', 'error')}: {error.get('message', 'no reply')}", file=sys.stderr)
+            return 1
+        for line in reader:
+            print(line.decode("utf-8").rstrip("\n"), flush=True)
+    print("IPC connection closed", file=sys.stderr)
+    return 1
 
-    return os.path.join(base, "nanomidiplayer.sock")
 
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("usage: nanomidi_cmd.py <command>")
+    words = [w for w in sys.argv[1:] if w != "--json"]
+    raw = "--json" in sys.argv[1:]
+    if not words:
+        print("usage: nanomidi_cmd.py [--json] <command> [value]")
         return 2
 
-    cmd = " ".join(sys.argv[1:]).strip()
     path = socket_path()
-
-    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     try:
-        s.connect(path)
-        s.sendall((cmd + "\n").encode("utf-8", "ignore"))
+        if words[0].lower() == "subscribe":
+            return subscribe(build_request(words), path)
+        reply = request(build_request(words), path)
     except FileNotFoundError:
         print(f"IPC socket not found: {path}\nIs nanoMIDIPlayer running?", file=sys.stderr)
         return 1
     except ConnectionRefusedError:
         print(f"IPC connection refused: {path}", file=sys.stderr)
         return 1
-    finally:
-        try:
-            s.close()
-        except Exception:
-            pass
-    return 0
+    except KeyboardInterrupt:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"IPC error: {e}", file=sys.stderr)
+        return 1
+
+    if raw:
+        print(json.dumps(reply))
+    elif not reply.get("ok"):
+        error = reply.get("error") or {}
+        print(f"{error.get('code', 'error')}: {error.get('message', '')}", file=sys.stderr)
+    elif isinstance(reply.get("result"), (dict, list)):
+        print(json.dumps(reply["result"], indent=2))
+    elif reply.get("result") is not True:
+        print(reply.get("result"))
+    return 0 if reply.get("ok") else 1
 
 
 if __name__ == "__main__":
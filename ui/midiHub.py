@@ -4,6 +4,7 @@ import platform
 import os
 
 import ui.customTheme as customTheme
+from ui.widget.tooltip import ToolTip
 from modules.functions import midiHubFunctions
 from modules.functions import mainFunctions
 
@@ -74,6 +75,7 @@ class MidiHubTab(ctk.CTkFrame):
         )
         self.searchEntry.grid(row=0, column=0, padx=20, pady=(10, 0), sticky="w")
         self.searchEntry.bind("<Return>", handleSearch)
+        self.searchEntry.bind("<KeyRelease>", midiHubFunctions.searchAsYouType)
         self.__class__.searchEntry = self.searchEntry
 
         self.searchButton = ctk.CTkButton(
@@ -107,3 +109,17 @@ class MidiHubTab(ctk.CTkFrame):
         self.sortComboBox.grid(row=0, column=0, padx=56, pady=(10, 0), sticky="e")
         self.sortComboBox.configure(state="readonly")
         self.__class__.sortComboBox = self.sortComboBox
+
+        self.downloadAllButton = ctk.CTkButton(
+            master=self.mainScrollFrame, 
+            text="", 
+            fg_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["DownloadButtonColor"], 
+            hover_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["DownloadButtonHoverColor"], 
+            width=24, 
+            height=24, 
+            command=midiHubFunctions.downloadAllResults, 
+            image=customTheme.downloadImageFile
+        )
+        self.downloadAllButton.grid(row=0, column=0, padx=166, pady=(10, 0), sticky="e")
+        ToolTip(self.downloadAllButton, "Download every result of the current search")
+        self.__class__.downloadAllButton = self.downloadAllButton
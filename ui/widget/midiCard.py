@@ -0,0 +1,83 @@
+import textwrap
+import customtkinter as ctk
+import ui.customTheme as customTheme
+
+
+def wrapText(text, width):
+    return "\n".join(textwrap.wrap(text, width=width, break_long_words=True))
+
+
+class MidiCard(ctk.CTkFrame):
+    """
+    One MIDI Hub result. The hub keeps a page's worth of these and
+    calls show() with the next entry instead of building new widgets.
+    """
+
+    def __init__(self, master, *args, **kwargs):
+        theme = customTheme.activeThemeData["Theme"]["MIDIHub"]
+        super().__init__(master, fg_color=theme["MidiCardBackColor"], *args, **kwargs)
+
+        self.imageButton = ctk.CTkButton(
+            master=self, text="", fg_color="transparent", width=100, height=100,
+            state="disabled", image=None
+        )
+        self.imageButton.grid(row=0, column=0, sticky="w")
+
+        # the four labels share one grid cell and are spread by pady,
+        # which show() recomputes from each label's line count
+        self.nameLabel = self._label(customTheme.globalFont14)
+        self.artistLabel = self._label(customTheme.globalFont12)
+        self.arrLabel = self._label(customTheme.globalFont11)
+        self.uploaderLabel = self._label(customTheme.globalFont11)
+
+        self.downloadButton = ctk.CTkButton(
+            master=self, text="", width=24, height=24,
+            fg_color=theme["DownloadButtonColor"],
+            hover_color=theme["DownloadButtonHoverColor"],
+            image=customTheme.downloadImageFile
+        )
+        self.imageFilename = None
+
+    def _label(self, font):
+        label = ctk.CTkLabel(
+            self, text="", font=font,
+            text_color=customTheme.activeThemeData["Theme"]["MIDIHub"]["TextColor"],
+            anchor="w", justify="left"
+        )
+        label.grid(row=0, column=0, padx=120, sticky="w")
+        return label
+
+    def show(self, midi, image=None, onDownload=None):
+        """Reconfigure the card for a catalog entry. onDownload() is bound to the download button."""
+        nameText = wrapText(midi["name"], 28)
+        artistText = wrapText(midi["artists"], 36)
+        arrText = "Arr: " + (wrapText(midi["arranger"], 36) if midi["arranger"] else "N/A")
+        uploaderText = "Uploader: " + wrapText(midi["uploader"], 36)
+
+        nameLines = nameText.count("\n") + 1
+        artistLines = artistText.count("\n") + 1
+        arrLines = arrText.count("\n") + 1
+        uploaderLines = uploaderText.count("\n") + 1
+        totalLines = nameLines + artistLines + arrLines + uploaderLines
+
+        self.configure(height=max(100, 40 + totalLines * 18))
+        self.nameLabel.configure(text=nameText)
+        self.nameLabel.grid_configure(pady=(0, 80 + (nameLines - 1) * 18))
+        self.artistLabel.configure(text=artistText)
+        self.artistLabel.grid_configure(pady=(0, 35 + (artistLines - 1) * 18))
+        self.arrLabel.configure(text=arrText)
+        self.arrLabel.grid_configure(pady=(40 + (arrLines - 1) * 18, 0))
+        self.uploaderLabel.configure(text=uploaderText)
+        self.uploaderLabel.grid_configure(pady=(80 + (uploaderLines - 1) * 18, 0))
+
+        self.imageFilename = midi.get("imageFilename")
+        self.setImage(image)
+
+        if onDownload is not None:
+            self.downloadButton.configure(command=onDownload)
+            self.downloadButton.grid(row=0, column=0, padx=345, pady=(75 + (totalLines - 4) * 18, 0), sticky="e")
+        else:
+            self.downloadButton.grid_remove()
+
+    def setImage(self, image):
+        self.imageButton.configure(image=image)